@@ -27,10 +27,14 @@ async def _handle_idempotent(
     operation_prefix: str,
     execute_fn,
 ):
-    """If idempotency key is present, check for cached response. Otherwise execute normally."""
+    """Execute once per idempotency key, committing the result with the operation.
+
+    A concurrent request with the same key waits for the first to finish
+    and replays its response instead of executing again.
+    """
     if idempotency_key:
         scoped_key = f"{operation_prefix}:{idempotency_key}"
-        existing = await atomic_service.check_idempotency(session, scoped_key)
+        existing = await atomic_service.reserve_idempotency_key(session, scoped_key)
         if existing:
             return JSONResponse(
                 status_code=existing.status_code,
@@ -38,14 +42,11 @@ async def _handle_idempotent(
             )
 
     result = await execute_fn()
-    await session.commit()
     enriched = enrich_task(result)
     response_data = TaskRead.model_validate(enriched).model_dump(mode="json")
-
     if idempotency_key:
         await atomic_service.store_idempotency(session, scoped_key, 200, response_data)
-        await session.commit()
-
+    await session.commit()
     return response_data
 
 
@@ -1,67 +1,110 @@
 import uuid
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
-from app.schemas.discovery import OperationFilter, TaskWithLockInfo
+from app.models.base import TaskType
+from app.schemas.discovery import OperationFilter, ScheduleMode, TaskWithLockInfo
 from app.schemas.task import TaskRead
 from app.services import discovery_service, project_service
 
 router = APIRouter(tags=["discovery"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Upper bound for the long-poll `wait` on /tasks/available, in seconds.
+MAX_WAIT_SECONDS = 60
+
+
+def _page(response: Response, page: tuple[list[dict], str | None]) -> list[dict]:
+    """Unpack a (items, next_cursor) page, exposing the cursor as a header."""
+    items, next_cursor = page
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
+
 
 @router.get("/projects/{project_id}/backlog", response_model=list[TaskRead])
 async def get_backlog(
     project_id: uuid.UUID,
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
     session: AsyncSession = Depends(get_session),
 ):
     await project_service.get_project(session, project_id)
-    return await discovery_service.get_backlog(session, project_id, limit, offset)
+    return _page(
+        response,
+        await discovery_service.get_backlog(session, project_id, limit, offset, cursor),
+    )
 
 
 @router.get("/projects/{project_id}/in-progress", response_model=list[TaskWithLockInfo])
 async def get_in_progress(
     project_id: uuid.UUID,
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
     session: AsyncSession = Depends(get_session),
 ):
     await project_service.get_project(session, project_id)
-    return await discovery_service.get_in_progress(session, project_id, limit, offset)
+    return _page(
+        response,
+        await discovery_service.get_in_progress(
+            session, project_id, limit, offset, cursor
+        ),
+    )
 
 
 @router.get("/projects/{project_id}/needs-refinement", response_model=list[TaskRead])
 async def get_needs_refinement(
     project_id: uuid.UUID,
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
     session: AsyncSession = Depends(get_session),
 ):
     await project_service.get_project(session, project_id)
-    return await discovery_service.get_needs_refinement(session, project_id, limit, offset)
+    return _page(
+        response,
+        await discovery_service.get_needs_refinement(
+            session, project_id, limit, offset, cursor
+        ),
+    )
 
 
 @router.get("/tasks/available", response_model=list[TaskRead])
 async def get_available(
     operation: OperationFilter,
+    response: Response,
     project_id: uuid.UUID | None = Query(None),
-    task_type: str | None = Query(None),
+    task_type: TaskType | None = Query(None),
     min_points: int | None = Query(None, ge=0),
     max_points: int | None = Query(None, ge=0),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+    schedule: ScheduleMode = Query(ScheduleMode.priority),
     session: AsyncSession = Depends(get_session),
 ):
-    return await discovery_service.get_available(
-        session,
-        operation=operation.value,
-        project_id=project_id,
-        task_type=task_type,
-        min_points=min_points,
-        max_points=max_points,
-        limit=limit,
-        offset=offset,
+    return _page(
+        response,
+        await discovery_service.wait_for_available(
+            session,
+            wait,
+            operation=operation.value,
+            project_id=project_id,
+            task_type=task_type,
+            min_points=min_points,
+            max_points=max_points,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            schedule=schedule,
+        ),
     )
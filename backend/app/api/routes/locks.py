@@ -4,10 +4,29 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
-from app.schemas.lock import LockAcquireRequest, LockRead
+from app.schemas.lock import (
+    ClaimRequest,
+    ClaimResponse,
+    LockAcquireRequest,
+    LockBatchRequest,
+    LockBatchResponse,
+    LockRead,
+)
 from app.services import lock_service
+from app.services.task_service import enrich_task
 
 router = APIRouter(prefix="/tasks", tags=["locks"])
+batch_router = APIRouter(prefix="/locks", tags=["locks"])
+
+
+@router.post("/claim", response_model=ClaimResponse, status_code=201)
+async def claim_task(
+    data: ClaimRequest,
+    session: AsyncSession = Depends(get_session),
+):
+    task, lock = await lock_service.claim_task(session, data)
+    await session.commit()
+    return {"task": enrich_task(task), "lock": lock}
 
 
 @router.post("/{task_id}/lock", response_model=LockRead, status_code=201)
@@ -41,3 +60,13 @@ async def release_lock(
 ):
     await lock_service.release_lock(session, task_id, caller_label, force)
     await session.commit()
+
+
+@batch_router.post("/batch", response_model=LockBatchResponse)
+async def batch_locks(
+    data: LockBatchRequest,
+    session: AsyncSession = Depends(get_session),
+):
+    results = await lock_service.batch_locks(session, data)
+    await session.commit()
+    return {"results": results}
@@ -1,13 +1,15 @@
 import uuid
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
+from app.exceptions import ChorusError
 from app.schemas.export import ProjectExportResponse
 from app.schemas.project import ProjectCreate, ProjectDetail, ProjectRead, ProjectUpdate
 from app.schemas.task import TaskRead
-from app.services import project_service, task_service
+from app.services import events, project_service, task_service
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -64,4 +66,24 @@ async def get_project_tasks(
     project_id: uuid.UUID, session: AsyncSession = Depends(get_session)
 ):
     tasks = await project_service.get_project_tasks(session, project_id)
-    return [task_service.enrich_task(t) for t in tasks]
+    return task_service.enrich_tasks(tasks)
+
+
+@router.get("/{project_id}/events")
+async def stream_project_events(
+    project_id: uuid.UUID,
+    last_event_id: str | None = Header(None, alias="Last-Event-ID"),
+    session: AsyncSession = Depends(get_session),
+):
+    await project_service.get_project(session, project_id)
+    resume_from = None
+    if last_event_id is not None:
+        try:
+            resume_from = int(last_event_id)
+        except ValueError:
+            raise ChorusError(400, "VALIDATION_ERROR", "Invalid Last-Event-ID")
+    return StreamingResponse(
+        events.stream_project_events(session, project_id, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -7,6 +7,7 @@ from app.db.session import get_session
 from app.schemas.task import (
     ReorderRequest,
     StatusUpdate,
+    TaskChildrenPage,
     TaskContextResponse,
     TaskCreate,
     TaskRead,
@@ -35,7 +36,7 @@ async def create_subtask(
     data: TaskCreate,
     session: AsyncSession = Depends(get_session),
 ):
-    parent = await task_service.get_task(session, task_id)
+    parent = await task_service.get_task(session, task_id, "row")
     task = await task_service.create_task(session, parent.project_id, data, parent_task_id=task_id)
     await session.commit()
     return task_service.enrich_task(task)
@@ -70,9 +71,22 @@ async def delete_task(
 
 @router.get("/tasks/{task_id}/tree", response_model=TaskTreeNode)
 async def get_task_tree(
-    task_id: uuid.UUID, session: AsyncSession = Depends(get_session)
+    task_id: uuid.UUID,
+    max_depth: int | None = Query(None, ge=0),
+    max_nodes: int | None = Query(None, ge=1),
+    session: AsyncSession = Depends(get_session),
+):
+    return await task_service.get_task_tree(session, task_id, max_depth, max_nodes)
+
+
+@router.get("/tasks/{task_id}/children", response_model=TaskChildrenPage)
+async def get_task_children(
+    task_id: uuid.UUID,
+    cursor: str | None = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    session: AsyncSession = Depends(get_session),
 ):
-    return await task_service.get_task_tree(session, task_id)
+    return await task_service.get_task_children(session, task_id, cursor, limit)
 
 
 @router.get("/tasks/{task_id}/ancestry", response_model=list[TaskRead])
@@ -80,7 +94,7 @@ async def get_task_ancestry(
     task_id: uuid.UUID, session: AsyncSession = Depends(get_session)
 ):
     tasks = await task_service.get_task_ancestry(session, task_id)
-    return [task_service.enrich_task(t) for t in tasks]
+    return task_service.enrich_tasks(tasks)
 
 
 @router.get("/tasks/{task_id}/context", response_model=TaskContextResponse)
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import create_async_engine
 
 from app.db.session import DATABASE_URL
 from app.models import Base  # noqa: F401 — ensures all models are registered
+from app.models.idempotency import IDEMPOTENCY_PARTITION_PREFIX
 
 config = context.config
 
@@ -20,10 +21,16 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_name(name, type_, parent_names) -> bool:
+    # Partitions are created and dropped at runtime, not by migrations
+    return not (type_ == "table" and name.startswith(IDEMPOTENCY_PARTITION_PREFIX))
+
+
 def run_migrations_offline() -> None:
     context.configure(
         url=DATABASE_URL,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -32,7 +39,9 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection, target_metadata=target_metadata, include_name=include_name
+    )
     with context.begin_transaction():
         context.run_migrations()
 
@@ -0,0 +1,30 @@
+"""add task type discovery indexes
+
+Revision ID: 0b5e93d7a6c2
+Revises: f2a86d0c4b17
+Create Date: 2026-10-17 17:05:12.336190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b5e93d7a6c2'
+down_revision: Union[str, None] = 'f2a86d0c4b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_tasks_backlog_type', 'tasks', ['task_type', 'effective_points', 'created_at', 'id'], unique=False, postgresql_where=sa.text("status = 'todo' AND readiness = 'ready'"))
+    op.create_index('idx_tasks_needs_breakdown_type', 'tasks', ['task_type', 'effective_points', 'created_at', 'id'], unique=False, postgresql_where=sa.text("status = 'todo' AND readiness = 'needs_breakdown'"))
+    op.create_index('idx_tasks_needs_sizing_type', 'tasks', ['task_type', 'effective_points', 'created_at', 'id'], unique=False, postgresql_where=sa.text('points IS NULL AND children_count = 0'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_tasks_needs_sizing_type', table_name='tasks', postgresql_where=sa.text('points IS NULL AND children_count = 0'))
+    op.drop_index('idx_tasks_needs_breakdown_type', table_name='tasks', postgresql_where=sa.text("status = 'todo' AND readiness = 'needs_breakdown'"))
+    op.drop_index('idx_tasks_backlog_type', table_name='tasks', postgresql_where=sa.text("status = 'todo' AND readiness = 'ready'"))
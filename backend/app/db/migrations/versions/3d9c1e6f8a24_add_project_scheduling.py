@@ -0,0 +1,30 @@
+"""add project scheduling
+
+Revision ID: 3d9c1e6f8a24
+Revises: 0b5e93d7a6c2
+Create Date: 2026-10-17 18:12:57.640318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9c1e6f8a24'
+down_revision: Union[str, None] = '0b5e93d7a6c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('projects', sa.Column('scheduling_weight', sa.Integer(), server_default=sa.text('1'), nullable=False))
+    op.add_column('projects', sa.Column('concurrency_caps', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.create_check_constraint('ck_projects_scheduling_weight', 'projects', 'scheduling_weight >= 1')
+
+
+def downgrade() -> None:
+    op.drop_constraint('ck_projects_scheduling_weight', 'projects', type_='check')
+    op.drop_column('projects', 'concurrency_caps')
+    op.drop_column('projects', 'scheduling_weight')
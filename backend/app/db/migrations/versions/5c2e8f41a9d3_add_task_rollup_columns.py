@@ -0,0 +1,79 @@
+"""add task rollup columns
+
+Revision ID: 5c2e8f41a9d3
+Revises: 01b96d02ccc7
+Create Date: 2026-10-17 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8f41a9d3'
+down_revision: Union[str, None] = '01b96d02ccc7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('effective_points', sa.Integer(), nullable=True))
+    op.add_column('tasks', sa.Column('rolled_up_points', sa.Integer(), nullable=True))
+    op.add_column('tasks', sa.Column('unsized_children', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('tasks', sa.Column('children_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('tasks', sa.Column('readiness', sa.String(length=32), server_default=sa.text("'needs_sizing'"), nullable=False))
+
+    # Backfill bottom-up: each level only needs its children's stored values.
+    bind = op.get_bind()
+    op.execute("CREATE TEMP TABLE task_depths (id uuid PRIMARY KEY, depth int NOT NULL) ON COMMIT DROP")
+    op.execute("""
+        INSERT INTO task_depths (id, depth)
+        WITH RECURSIVE walk AS (
+            SELECT id, 0 AS depth FROM tasks WHERE parent_task_id IS NULL
+            UNION ALL
+            SELECT t.id, w.depth + 1 FROM tasks t JOIN walk w ON t.parent_task_id = w.id
+        )
+        SELECT id, depth FROM walk
+    """)
+    max_depth = bind.execute(sa.text("SELECT coalesce(max(depth), -1) FROM task_depths")).scalar()
+    for depth in range(max_depth, -1, -1):
+        bind.execute(sa.text("""
+            UPDATE tasks t SET
+                children_count = agg.children_count,
+                unsized_children = agg.unsized_children,
+                rolled_up_points = agg.rolled_up_points,
+                effective_points = coalesce(agg.rolled_up_points, t.points),
+                updated_at = t.updated_at
+            FROM (
+                SELECT d.id,
+                       count(c.id) AS children_count,
+                       count(c.id) FILTER (WHERE c.points IS NULL) AS unsized_children,
+                       sum(c.effective_points) AS rolled_up_points
+                FROM task_depths d
+                LEFT JOIN tasks c ON c.parent_task_id = d.id
+                WHERE d.depth = :depth
+                GROUP BY d.id
+            ) agg
+            WHERE t.id = agg.id
+        """), {"depth": depth})
+
+    op.execute("""
+        UPDATE tasks SET readiness = CASE
+            WHEN needs_refinement THEN 'needs_refinement'
+            WHEN points IS NULL AND children_count = 0 THEN 'needs_sizing'
+            WHEN children_count > 0 AND unsized_children > 0 THEN 'needs_breakdown'
+            WHEN effective_points > 6 THEN 'needs_breakdown'
+            WHEN children_count > 0 THEN 'blocked_by_children'
+            ELSE 'ready'
+        END
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'readiness')
+    op.drop_column('tasks', 'children_count')
+    op.drop_column('tasks', 'unsized_children')
+    op.drop_column('tasks', 'rolled_up_points')
+    op.drop_column('tasks', 'effective_points')
@@ -0,0 +1,87 @@
+"""partition idempotency records
+
+Revision ID: 9948054b4ae2
+Revises: 3d9c1e6f8a24
+Create Date: 2026-10-17 21:40:12.118504
+
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '9948054b4ae2'
+down_revision: Union[str, None] = '3d9c1e6f8a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Matches atomic_service.IDEMPOTENCY_PARTITIONS_AHEAD; later days are
+# created by the maintenance job.
+PARTITIONS_AHEAD = 3
+
+
+def upgrade() -> None:
+    op.drop_index('idx_idempotency_key', table_name='idempotency_records')
+    op.drop_index('idx_idempotency_expires', table_name='idempotency_records')
+    op.rename_table('idempotency_records', 'idempotency_records_old')
+    op.execute('ALTER TABLE idempotency_records_old RENAME CONSTRAINT idempotency_records_pkey TO idempotency_records_old_pkey')
+
+    op.create_table('idempotency_records',
+    sa.Column('id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('key', sa.String(length=512), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=False),
+    sa.Column('response_body', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'expires_at'),
+    postgresql_partition_by='RANGE (expires_at)'
+    )
+    op.create_index('idx_idempotency_key', 'idempotency_records', ['key'], unique=False)
+
+    # Live records expire within IDEMPOTENCY_TTL (24h), so today's and the
+    # next few days' partitions hold every row worth keeping.
+    today = datetime.now(timezone.utc).date()
+    for offset in range(PARTITIONS_AHEAD + 1):
+        day = today + timedelta(days=offset)
+        op.execute(
+            f"CREATE TABLE idempotency_records_p{day:%Y%m%d} PARTITION OF idempotency_records "
+            f"FOR VALUES FROM ('{day.isoformat()} 00:00+00') "
+            f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00+00')"
+        )
+    op.execute(
+        'INSERT INTO idempotency_records (id, key, status_code, response_body, created_at, expires_at) '
+        'SELECT id, key, status_code, response_body, created_at, expires_at '
+        'FROM idempotency_records_old WHERE expires_at > now()'
+    )
+    op.drop_table('idempotency_records_old')
+
+
+def downgrade() -> None:
+    op.rename_table('idempotency_records', 'idempotency_records_partitioned')
+    op.execute('ALTER INDEX idx_idempotency_key RENAME TO idx_idempotency_key_partitioned')
+    op.execute('ALTER TABLE idempotency_records_partitioned RENAME CONSTRAINT idempotency_records_pkey TO idempotency_records_partitioned_pkey')
+
+    op.create_table('idempotency_records',
+    sa.Column('id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('key', sa.String(length=512), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=False),
+    sa.Column('response_body', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', postgresql.TIMESTAMP(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key')
+    )
+    op.create_index('idx_idempotency_expires', 'idempotency_records', ['expires_at'], unique=False)
+    op.create_index('idx_idempotency_key', 'idempotency_records', ['key'], unique=True)
+    # Keep the earliest record per key, as check_idempotency would have
+    op.execute(
+        'INSERT INTO idempotency_records (id, key, status_code, response_body, created_at, expires_at) '
+        'SELECT DISTINCT ON (key) id, key, status_code, response_body, created_at, expires_at '
+        'FROM idempotency_records_partitioned WHERE expires_at > now() '
+        'ORDER BY key, created_at'
+    )
+    # Dropping the parent drops its partitions
+    op.drop_table('idempotency_records_partitioned')
@@ -0,0 +1,46 @@
+"""add task closure
+
+Revision ID: 9a41c7e2b6f0
+Revises: 5c2e8f41a9d3
+Create Date: 2026-10-17 11:03:27.552910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a41c7e2b6f0'
+down_revision: Union[str, None] = '5c2e8f41a9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('task_closure',
+    sa.Column('ancestor_id', sa.UUID(), nullable=False),
+    sa.Column('descendant_id', sa.UUID(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['tasks.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['tasks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('idx_closure_descendant', 'task_closure', ['descendant_id', 'depth'], unique=False)
+
+    op.execute("""
+        INSERT INTO task_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE walk AS (
+            SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth FROM tasks
+            UNION ALL
+            SELECT w.ancestor_id, t.id, w.depth + 1
+            FROM tasks t JOIN walk w ON t.parent_task_id = w.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM walk
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_closure_descendant', table_name='task_closure')
+    op.drop_table('task_closure')
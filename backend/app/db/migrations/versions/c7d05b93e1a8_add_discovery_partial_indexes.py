@@ -0,0 +1,30 @@
+"""add discovery partial indexes
+
+Revision ID: c7d05b93e1a8
+Revises: 9a41c7e2b6f0
+Create Date: 2026-10-17 13:40:09.127364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d05b93e1a8'
+down_revision: Union[str, None] = '9a41c7e2b6f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_tasks_backlog', 'tasks', ['project_id', 'effective_points', 'created_at', 'id'], unique=False, postgresql_where=sa.text("status = 'todo' AND readiness = 'ready'"))
+    op.create_index('idx_tasks_needs_breakdown', 'tasks', ['project_id', 'effective_points', 'created_at', 'id'], unique=False, postgresql_where=sa.text("status = 'todo' AND readiness = 'needs_breakdown'"))
+    op.create_index('idx_tasks_needs_sizing', 'tasks', ['project_id', 'created_at', 'id'], unique=False, postgresql_where=sa.text('points IS NULL AND children_count = 0'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_tasks_needs_sizing', table_name='tasks', postgresql_where=sa.text('points IS NULL AND children_count = 0'))
+    op.drop_index('idx_tasks_needs_breakdown', table_name='tasks', postgresql_where=sa.text("status = 'todo' AND readiness = 'needs_breakdown'"))
+    op.drop_index('idx_tasks_backlog', table_name='tasks', postgresql_where=sa.text("status = 'todo' AND readiness = 'ready'"))
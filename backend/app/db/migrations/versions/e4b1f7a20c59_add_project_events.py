@@ -0,0 +1,39 @@
+"""add project events
+
+Revision ID: e4b1f7a20c59
+Revises: c7d05b93e1a8
+Create Date: 2026-10-17 15:02:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b1f7a20c59'
+down_revision: Union[str, None] = 'c7d05b93e1a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('project_events',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('task_id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.String(length=64), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_events_created', 'project_events', ['created_at'], unique=False)
+    op.create_index('idx_events_project', 'project_events', ['project_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_events_project', table_name='project_events')
+    op.drop_index('idx_events_created', table_name='project_events')
+    op.drop_table('project_events')
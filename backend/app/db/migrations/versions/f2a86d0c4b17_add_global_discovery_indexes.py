@@ -0,0 +1,35 @@
+"""add global discovery indexes
+
+Revision ID: f2a86d0c4b17
+Revises: e4b1f7a20c59
+Create Date: 2026-10-17 16:21:38.904112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a86d0c4b17'
+down_revision: Union[str, None] = 'e4b1f7a20c59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_tasks_backlog_global', 'tasks', ['effective_points', 'created_at', 'id'], unique=False, postgresql_where=sa.text("status = 'todo' AND readiness = 'ready'"))
+    op.create_index('idx_tasks_needs_breakdown_global', 'tasks', ['effective_points', 'created_at', 'id'], unique=False, postgresql_where=sa.text("status = 'todo' AND readiness = 'needs_breakdown'"))
+    op.create_index('idx_tasks_needs_sizing_global', 'tasks', ['effective_points', 'created_at', 'id'], unique=False, postgresql_where=sa.text('points IS NULL AND children_count = 0'))
+    # Lead with the full sort key so the per-project sizing queue needs no sort
+    op.drop_index('idx_tasks_needs_sizing', table_name='tasks', postgresql_where=sa.text('points IS NULL AND children_count = 0'))
+    op.create_index('idx_tasks_needs_sizing', 'tasks', ['project_id', 'effective_points', 'created_at', 'id'], unique=False, postgresql_where=sa.text('points IS NULL AND children_count = 0'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_tasks_needs_sizing', table_name='tasks', postgresql_where=sa.text('points IS NULL AND children_count = 0'))
+    op.create_index('idx_tasks_needs_sizing', 'tasks', ['project_id', 'created_at', 'id'], unique=False, postgresql_where=sa.text('points IS NULL AND children_count = 0'))
+    op.drop_index('idx_tasks_needs_sizing_global', table_name='tasks', postgresql_where=sa.text('points IS NULL AND children_count = 0'))
+    op.drop_index('idx_tasks_needs_breakdown_global', table_name='tasks', postgresql_where=sa.text("status = 'todo' AND readiness = 'needs_breakdown'"))
+    op.drop_index('idx_tasks_backlog_global', table_name='tasks', postgresql_where=sa.text("status = 'todo' AND readiness = 'ready'"))
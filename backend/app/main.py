@@ -10,12 +10,14 @@ from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.api.routes.atomic import router as atomic_router
 from app.api.routes.discovery import router as discovery_router
+from app.api.routes.locks import batch_router as lock_batch_router
 from app.api.routes.locks import router as locks_router
 from app.api.routes.projects import router as projects_router
 from app.api.routes.tasks import router as tasks_router
-from app.db.session import async_session
+from app.db.session import DATABASE_URL, async_session
 from app.exceptions import ChorusError
-from app.services.lock_service import start_lock_cleanup_task
+from app.services.events import start_event_listener
+from app.services.maintenance import start_maintenance
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +33,11 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    cleanup_task = start_lock_cleanup_task(async_session)
+    maintenance_task = start_maintenance(DATABASE_URL, async_session)
+    listener_task = start_event_listener(DATABASE_URL)
     yield
-    cleanup_task.cancel()
+    listener_task.cancel()
+    maintenance_task.cancel()
 
 
 app = FastAPI(title="Chorus", lifespan=lifespan)
@@ -46,6 +50,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -113,6 +118,7 @@ app.include_router(projects_router)
 app.include_router(discovery_router)
 app.include_router(tasks_router)
 app.include_router(locks_router)
+app.include_router(lock_batch_router)
 app.include_router(atomic_router)
 
 
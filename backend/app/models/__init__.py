@@ -1,9 +1,11 @@
 from app.models.base import Base
+from app.models.closure import TaskClosure
 from app.models.commit import TaskCommit
+from app.models.event import ProjectEvent
 from app.models.idempotency import IdempotencyRecord
 from app.models.lock import TaskLock
 from app.models.project import Project
 from app.models.task import Task
 from app.models.work_log import WorkLogEntry
 
-__all__ = ["Base", "IdempotencyRecord", "Project", "Task", "TaskLock", "TaskCommit", "WorkLogEntry"]
+__all__ = ["Base", "IdempotencyRecord", "Project", "ProjectEvent", "Task", "TaskClosure", "TaskLock", "TaskCommit", "WorkLogEntry"]
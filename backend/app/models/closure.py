@@ -0,0 +1,24 @@
+import uuid
+
+from sqlalchemy import ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class TaskClosure(Base):
+    """One row per (ancestor, descendant) pair, including depth-0 self rows."""
+
+    __tablename__ = "task_closure"
+    __table_args__ = (
+        Index("idx_closure_descendant", "descendant_id", "depth"),
+    )
+
+    ancestor_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
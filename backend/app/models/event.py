@@ -0,0 +1,33 @@
+import uuid
+
+from sqlalchemy import BigInteger, ForeignKey, Identity, Index, String, text
+from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ProjectEvent(Base):
+    """Append-only change log backing the project event stream.
+
+    The id is the SSE event id, so a reconnecting client can resume with
+    Last-Event-ID. task_id has no foreign key: task.deleted events outlive
+    their task.
+    """
+
+    __tablename__ = "project_events"
+    __table_args__ = (
+        Index("idx_events_project", "project_id", "id"),
+        Index("idx_events_created", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False
+    )
+    task_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    data = mapped_column(JSONB, nullable=True)
+    created_at = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
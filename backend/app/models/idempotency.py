@@ -6,21 +6,31 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
 
+# Daily partitions are named idempotency_records_pYYYYMMDD and managed by
+# atomic_service, not by the model metadata.
+IDEMPOTENCY_PARTITION_PREFIX = "idempotency_records_p"
+
 
 class IdempotencyRecord(Base):
+    """Stored responses, range-partitioned by expires_at so whole days expire at once.
+
+    Primary and unique keys of a partitioned table must include the
+    partition column, so key is only indexed, not unique.
+    """
+
     __tablename__ = "idempotency_records"
     __table_args__ = (
-        Index("idx_idempotency_key", "key", unique=True),
-        Index("idx_idempotency_expires", "expires_at"),
+        Index("idx_idempotency_key", "key"),
+        {"postgresql_partition_by": "RANGE (expires_at)"},
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
     )
-    key: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
+    key: Mapped[str] = mapped_column(String(512), nullable=False)
     status_code: Mapped[int] = mapped_column(nullable=False)
     response_body = mapped_column(JSONB, nullable=False)
     created_at = mapped_column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
-    expires_at = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    expires_at = mapped_column(TIMESTAMP(timezone=True), primary_key=True)
@@ -1,7 +1,7 @@
 import uuid
 
-from sqlalchemy import String, Text, text
-from sqlalchemy.dialects.postgresql import TIMESTAMP, UUID
+from sqlalchemy import CheckConstraint, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, TIMESTAMP, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -9,12 +9,21 @@ from app.models.base import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        CheckConstraint("scheduling_weight >= 1", name="ck_projects_scheduling_weight"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
     )
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Fair-share scheduling: relative share of agent work, and optional
+    # per-operation limits on concurrently held locks, e.g. {"implementation": 3}
+    scheduling_weight: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default=text("1")
+    )
+    concurrency_caps = mapped_column(JSONB, nullable=True)
     created_at = mapped_column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
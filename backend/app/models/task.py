@@ -6,6 +6,12 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, status_enum, task_type_enum
 
+# Discovery queue predicates. Queries use these exact literals (not bind
+# parameters) so prepared statements can always match the partial indexes.
+BACKLOG_PREDICATE = "status = 'todo' AND readiness = 'ready'"
+NEEDS_BREAKDOWN_PREDICATE = "status = 'todo' AND readiness = 'needs_breakdown'"
+NEEDS_SIZING_PREDICATE = "points IS NULL AND children_count = 0"
+
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -19,6 +25,55 @@ class Task(Base):
         Index("idx_tasks_parent", "parent_task_id"),
         Index("idx_tasks_status", "status"),
         Index("idx_tasks_points", "points"),
+        # Discovery queues, matching discovery_service's predicates and sort order
+        Index(
+            "idx_tasks_backlog",
+            "project_id", "effective_points", "created_at", "id",
+            postgresql_where=text(BACKLOG_PREDICATE),
+        ),
+        Index(
+            "idx_tasks_needs_breakdown",
+            "project_id", "effective_points", "created_at", "id",
+            postgresql_where=text(NEEDS_BREAKDOWN_PREDICATE),
+        ),
+        Index(
+            "idx_tasks_needs_sizing",
+            "project_id", "effective_points", "created_at", "id",
+            postgresql_where=text(NEEDS_SIZING_PREDICATE),
+        ),
+        # Cross-project queues for /tasks/available without project_id
+        Index(
+            "idx_tasks_backlog_global",
+            "effective_points", "created_at", "id",
+            postgresql_where=text(BACKLOG_PREDICATE),
+        ),
+        Index(
+            "idx_tasks_needs_breakdown_global",
+            "effective_points", "created_at", "id",
+            postgresql_where=text(NEEDS_BREAKDOWN_PREDICATE),
+        ),
+        Index(
+            "idx_tasks_needs_sizing_global",
+            "effective_points", "created_at", "id",
+            postgresql_where=text(NEEDS_SIZING_PREDICATE),
+        ),
+        # Cross-project queues narrowed by task_type; point ranges are index
+        # conditions on effective_points in every queue index
+        Index(
+            "idx_tasks_backlog_type",
+            "task_type", "effective_points", "created_at", "id",
+            postgresql_where=text(BACKLOG_PREDICATE),
+        ),
+        Index(
+            "idx_tasks_needs_breakdown_type",
+            "task_type", "effective_points", "created_at", "id",
+            postgresql_where=text(NEEDS_BREAKDOWN_PREDICATE),
+        ),
+        Index(
+            "idx_tasks_needs_sizing_type",
+            "task_type", "effective_points", "created_at", "id",
+            postgresql_where=text(NEEDS_SIZING_PREDICATE),
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -42,6 +97,15 @@ class Task(Base):
     refinement_notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     context_captured_at = mapped_column(TIMESTAMP(timezone=True), nullable=True)
     position: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+
+    # Stored rollups, maintained by task_service.refresh_rollups on every write
+    effective_points: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rolled_up_points: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    unsized_children: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    children_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    readiness: Mapped[str] = mapped_column(
+        String(32), nullable=False, server_default=text("'needs_sizing'")
+    )
     created_at = mapped_column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
@@ -10,6 +10,17 @@ class OperationFilter(str, Enum):
     implementation = "implementation"
 
 
+class ScheduleMode(str, Enum):
+    """How cross-project work is ordered.
+
+    priority: smallest effective_points first, regardless of project.
+    fair: deficit round robin across projects by weight, within caps.
+    """
+
+    priority = "priority"
+    fair = "fair"
+
+
 class TaskWithLockInfo(TaskRead):
     lock_caller_label: str | None = None
     lock_purpose: str | None = None
@@ -1,9 +1,12 @@
 import uuid
 from datetime import datetime
+from enum import Enum
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
-from app.models.base import LockPurpose
+from app.models.base import LockPurpose, TaskType
+from app.schemas.discovery import OperationFilter, ScheduleMode
+from app.schemas.task import TaskRead
 
 
 class LockAcquireRequest(BaseModel):
@@ -21,3 +24,77 @@ class LockRead(BaseModel):
     acquired_at: datetime
     last_heartbeat_at: datetime | None
     expires_at: datetime
+
+
+class ClaimRequest(BaseModel):
+    caller_label: str
+    operation: OperationFilter
+    project_id: uuid.UUID | None = None
+    task_type: TaskType | None = None
+    min_points: int | None = Field(None, ge=0)
+    max_points: int | None = Field(None, ge=0)
+    schedule: ScheduleMode = ScheduleMode.priority
+
+
+class ClaimResponse(BaseModel):
+    task: TaskRead
+    lock: LockRead
+
+
+# Upper bound on items in one POST /locks/batch
+LOCK_BATCH_MAX_ITEMS = 500
+
+
+class LockBatchAction(str, Enum):
+    acquire = "acquire"
+    heartbeat = "heartbeat"
+    release = "release"
+
+
+class LockBatchMode(str, Enum):
+    best_effort = "best_effort"
+    all_or_nothing = "all_or_nothing"
+
+
+class LockBatchItem(BaseModel):
+    task_id: uuid.UUID
+    caller_label: str
+    lock_purpose: LockPurpose | None = None
+
+
+class LockBatchRequest(BaseModel):
+    action: LockBatchAction
+    mode: LockBatchMode = LockBatchMode.best_effort
+    force: bool = False
+    items: list[LockBatchItem] = Field(min_length=1, max_length=LOCK_BATCH_MAX_ITEMS)
+
+    @field_validator("items")
+    @classmethod
+    def validate_unique_tasks(cls, v: list[LockBatchItem]) -> list[LockBatchItem]:
+        if len({item.task_id for item in v}) != len(v):
+            raise ValueError("Each task may appear only once per batch")
+        return v
+
+    @model_validator(mode="after")
+    def validate_purposes(self) -> "LockBatchRequest":
+        if self.action == LockBatchAction.acquire and any(
+            item.lock_purpose is None for item in self.items
+        ):
+            raise ValueError("lock_purpose is required for every acquire item")
+        return self
+
+
+class LockBatchError(BaseModel):
+    code: str
+    message: str
+
+
+class LockBatchResult(BaseModel):
+    task_id: uuid.UUID
+    ok: bool
+    lock: LockRead | None = None
+    error: LockBatchError | None = None
+
+
+class LockBatchResponse(BaseModel):
+    results: list[LockBatchResult]
@@ -1,17 +1,26 @@
 import uuid
 from datetime import datetime
+from typing import Annotated
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.discovery import OperationFilter
+
+ConcurrencyCaps = dict[OperationFilter, Annotated[int, Field(ge=0)]]
 
 
 class ProjectCreate(BaseModel):
     name: str
     description: str | None = None
+    scheduling_weight: int = Field(1, ge=1)
+    concurrency_caps: ConcurrencyCaps | None = None
 
 
 class ProjectUpdate(BaseModel):
     name: str | None = None
     description: str | None = None
+    scheduling_weight: int | None = Field(None, ge=1)
+    concurrency_caps: ConcurrencyCaps | None = None
 
 
 class ProjectRead(BaseModel):
@@ -20,6 +29,8 @@ class ProjectRead(BaseModel):
     id: uuid.UUID
     name: str
     description: str | None
+    scheduling_weight: int
+    concurrency_caps: dict[str, int] | None
     created_at: datetime
     updated_at: datetime
 
@@ -49,6 +49,12 @@ class TaskRead(BaseModel):
 
 class TaskTreeNode(TaskRead):
     children: list["TaskTreeNode"] = []
+    expand_cursor: str | None = None
+
+
+class TaskChildrenPage(BaseModel):
+    children: list[TaskTreeNode]
+    next_cursor: str | None = None
 
 
 class TaskAncestryItem(BaseModel):
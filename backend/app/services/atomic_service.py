@@ -1,15 +1,16 @@
+import logging
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.base import Operation, Status
 from app.models.commit import TaskCommit
-from app.models.idempotency import IdempotencyRecord
+from app.models.idempotency import IDEMPOTENCY_PARTITION_PREFIX, IdempotencyRecord
 from app.models.task import Task
 from app.models.work_log import WorkLogEntry
+from app.services import events, idempotency_cache, maintenance
 from app.schemas.atomic import (
     BreakdownRequest,
     CommitCreate,
@@ -18,47 +19,179 @@ from app.schemas.atomic import (
     RefineRequest,
     SizingRequest,
 )
-from app.services.task_service import _task_load_options, get_task
+from app.services.task_service import (
+    _load_options,
+    ensure_task_exists,
+    get_task,
+    index_hierarchy,
+    refresh_rollups,
+)
+
+logger = logging.getLogger(__name__)
 
 IDEMPOTENCY_TTL = timedelta(hours=24)
 
+# Daily partitions created ahead of today; inserts fail without one, so this
+# is how long maintenance may be down before idempotent calls break.
+IDEMPOTENCY_PARTITIONS_AHEAD = 3
+IDEMPOTENCY_PARTITION_CHECK_SECONDS = 600
+
 
 async def check_idempotency(
     session: AsyncSession, key: str
 ) -> IdempotencyRecord | None:
+    """The stored response for a key, from the in-process cache when possible."""
+    hit = idempotency_cache.cache.get(key)
+    if hit is not None:
+        # Detached and never added to the session; callers only read it
+        return IdempotencyRecord(key=key, status_code=hit[0], response_body=hit[1])
+
+    # No live record expires before now or after now + TTL, so the bounds
+    # prune to today's and tomorrow's partitions, each probed by key.
+    now = datetime.now(timezone.utc)
     result = await session.execute(
-        select(IdempotencyRecord).where(IdempotencyRecord.key == key)
+        select(IdempotencyRecord)
+        .where(
+            IdempotencyRecord.key == key,
+            IdempotencyRecord.expires_at > now,
+            IdempotencyRecord.expires_at <= now + IDEMPOTENCY_TTL,
+        )
+        .order_by(IdempotencyRecord.created_at)
+        .limit(1)
     )
     record = result.scalar_one_or_none()
-    if record and record.expires_at > datetime.now(timezone.utc):
-        return record
-    return None
+    if record is not None:
+        # Committed by another worker; safe to remember as it never changes
+        idempotency_cache.cache.put(
+            key, record.status_code, record.response_body, record.expires_at
+        )
+    return record
+
+
+async def reserve_idempotency_key(
+    session: AsyncSession, key: str
+) -> IdempotencyRecord | None:
+    """Reserve a key for this transaction, or return its stored response.
+
+    The reservation is a transaction-level advisory lock on the key's hash,
+    so a concurrent duplicate waits here until the first request commits
+    (and then finds its record) or rolls back (and then runs itself). The
+    caller stores the response in the same transaction as the operation.
+    """
+    hit = idempotency_cache.cache.get(key)
+    if hit is not None:
+        return IdempotencyRecord(key=key, status_code=hit[0], response_body=hit[1])
+    await session.execute(
+        select(func.pg_advisory_xact_lock(func.hashtextextended(key, 0)))
+    )
+    return await check_idempotency(session, key)
+
+
+def _partition_name(day: date) -> str:
+    return f"{IDEMPOTENCY_PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+async def _idempotency_partitions(session: AsyncSession) -> dict[date, str]:
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'idempotency_records'::regclass"
+        )
+    )
+    partitions = {}
+    for name in result.scalars().all():
+        suffix = name.removeprefix(IDEMPOTENCY_PARTITION_PREFIX)
+        try:
+            partitions[datetime.strptime(suffix, "%Y%m%d").date()] = name
+        except ValueError:
+            continue  # not one of ours
+    return partitions
+
+
+async def ensure_idempotency_partitions(
+    session: AsyncSession, now: datetime | None = None
+) -> list[str]:
+    """Create the daily partitions from today through IDEMPOTENCY_PARTITIONS_AHEAD."""
+    today = (now or datetime.now(timezone.utc)).date()
+    existing = await _idempotency_partitions(session)
+    created = []
+    for offset in range(IDEMPOTENCY_PARTITIONS_AHEAD + 1):
+        day = today + timedelta(days=offset)
+        if day in existing:
+            continue
+        name = _partition_name(day)
+        await session.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF idempotency_records "
+                f"FOR VALUES FROM ('{day.isoformat()} 00:00+00') "
+                f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00+00')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+async def drop_expired_idempotency_partitions(
+    session: AsyncSession, now: datetime | None = None
+) -> list[str]:
+    """Detach and drop every partition whose whole range has expired."""
+    today = (now or datetime.now(timezone.utc)).date()
+    dropped = []
+    for day, name in sorted((await _idempotency_partitions(session)).items()):
+        # The partition ends at midnight after `day`
+        if day >= today:
+            break
+        await session.execute(text(f"ALTER TABLE idempotency_records DETACH PARTITION {name}"))
+        await session.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+async def _maintain_idempotency_partitions(session_factory) -> None:
+    async with session_factory() as session:
+        created = await ensure_idempotency_partitions(session)
+        dropped = await drop_expired_idempotency_partitions(session)
+        await session.commit()
+    if created:
+        logger.info("Created idempotency partitions %s", ", ".join(created))
+    if dropped:
+        logger.info("Dropped expired idempotency partitions %s", ", ".join(dropped))
+
+
+maintenance.register_periodic_job(
+    "idempotency_partitions",
+    IDEMPOTENCY_PARTITION_CHECK_SECONDS,
+    _maintain_idempotency_partitions,
+    # Partitions may have run out while maintenance was down
+    run_at_start=True,
+)
 
 
 async def store_idempotency(
     session: AsyncSession, key: str, status_code: int, response_body: dict
 ) -> None:
+    # Callers hold the key's reservation, so duplicates can't store it too
     now = datetime.now(timezone.utc)
-    record = IdempotencyRecord(
-        key=key,
-        status_code=status_code,
-        response_body=response_body,
-        created_at=now,
-        expires_at=now + IDEMPOTENCY_TTL,
+    session.add(
+        IdempotencyRecord(
+            key=key,
+            status_code=status_code,
+            response_body=response_body,
+            created_at=now,
+            expires_at=now + IDEMPOTENCY_TTL,
+        )
+    )
+    await session.flush()
+    idempotency_cache.put_after_commit(
+        session, key, status_code, response_body, now + IDEMPOTENCY_TTL
     )
-    session.add(record)
-    try:
-        await session.flush()
-    except IntegrityError:
-        await session.rollback()
-        # Another request already stored the result; that's fine
 
 
 async def _reload_task(session: AsyncSession, task_id: uuid.UUID) -> Task:
     # Expire all to ensure fresh relationship loading (e.g. new children)
     session.expire_all()
     result = await session.execute(
-        select(Task).where(Task.id == task_id).options(*_task_load_options())
+        select(Task).where(Task.id == task_id).options(*_load_options("lock"))
     )
     return result.scalar_one()
 
@@ -77,13 +210,16 @@ async def create_work_log_entry(
         author=author,
     )
     session.add(entry)
+    await events.publish(
+        session, events.WORK_LOG_APPENDED, [task_id], {"operation": operation.value}
+    )
     return entry
 
 
 async def size_task(
     session: AsyncSession, task_id: uuid.UUID, data: SizingRequest
 ) -> Task:
-    task = await get_task(session, task_id)
+    task = await get_task(session, task_id, "row")
 
     dimensions = {
         "scope_clarity": data.scope_clarity.model_dump(),
@@ -112,13 +248,15 @@ async def size_task(
         session, task_id, Operation.sizing, data.work_log_content, data.author
     )
     await session.flush()
+    await refresh_rollups(session, task_id)
+    await events.publish(session, events.TASK_UPDATED, [task_id])
     return await _reload_task(session, task_id)
 
 
 async def breakdown_task(
     session: AsyncSession, task_id: uuid.UUID, data: BreakdownRequest
 ) -> Task:
-    task = await get_task(session, task_id)
+    task = await get_task(session, task_id, "row")
 
     if data.parent_description_update:
         task.description = data.parent_description_update
@@ -134,6 +272,7 @@ async def breakdown_task(
     )
     next_position = result.scalar() + 1
 
+    children = []
     for i, subtask_data in enumerate(data.subtasks):
         position = subtask_data.position if subtask_data.position is not None else next_position + i
 
@@ -147,18 +286,23 @@ async def breakdown_task(
             position=position,
         )
         session.add(child)
+        children.append(child)
 
     await create_work_log_entry(
         session, task_id, Operation.breakdown, data.work_log_content, data.author
     )
     await session.flush()
+    await index_hierarchy(session, task_id, [c.id for c in children])
+    await refresh_rollups(session, task_id)
+    await events.publish(session, events.TASK_CREATED, [c.id for c in children])
+    await events.publish(session, events.TASK_UPDATED, [task_id])
     return await _reload_task(session, task_id)
 
 
 async def refine_task(
     session: AsyncSession, task_id: uuid.UUID, data: RefineRequest
 ) -> Task:
-    task = await get_task(session, task_id)
+    task = await get_task(session, task_id, "row")
 
     if data.description is not None:
         task.description = data.description
@@ -173,16 +317,20 @@ async def refine_task(
         session, task_id, Operation.refinement, data.work_log_content, data.author
     )
     await session.flush()
+    await refresh_rollups(session, task_id)
+    await events.publish(session, events.TASK_UPDATED, [task_id])
     return await _reload_task(session, task_id)
 
 
 async def flag_refinement(
     session: AsyncSession, task_id: uuid.UUID, data: FlagRefinementRequest
 ) -> Task:
-    task = await get_task(session, task_id)
+    task = await get_task(session, task_id, "row")
     task.needs_refinement = True
     task.refinement_notes = data.refinement_notes
     await session.flush()
+    await refresh_rollups(session, task_id)
+    await events.publish(session, events.TASK_UPDATED, [task_id])
     return await _reload_task(session, task_id)
 
 
@@ -214,8 +362,7 @@ async def complete_task(
 async def get_work_log(
     session: AsyncSession, task_id: uuid.UUID
 ) -> list[WorkLogEntry]:
-    # Verify task exists
-    await get_task(session, task_id)
+    await ensure_task_exists(session, task_id)
     result = await session.execute(
         select(WorkLogEntry)
         .where(WorkLogEntry.task_id == task_id)
@@ -227,7 +374,7 @@ async def get_work_log(
 async def create_commit(
     session: AsyncSession, task_id: uuid.UUID, data: CommitCreate
 ) -> TaskCommit:
-    await get_task(session, task_id)
+    await ensure_task_exists(session, task_id)
     commit = TaskCommit(
         task_id=task_id,
         commit_hash=data.commit_hash,
@@ -243,7 +390,7 @@ async def create_commit(
 async def get_commits(
     session: AsyncSession, task_id: uuid.UUID
 ) -> list[TaskCommit]:
-    await get_task(session, task_id)
+    await ensure_task_exists(session, task_id)
     result = await session.execute(
         select(TaskCommit)
         .where(TaskCommit.task_id == task_id)
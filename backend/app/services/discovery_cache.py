@@ -0,0 +1,93 @@
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+from app.services import events
+
+T = TypeVar("T")
+
+CACHE_MAX_ENTRIES = 1024
+
+# Safety net for what no write announces: locks lapsing on their own, and
+# notifications missed while the listener reconnects.
+CACHE_TTL_SECONDS = 5.0
+
+# Events after which a task may have become available for some operation.
+AVAILABILITY_EVENTS = frozenset(
+    {
+        events.TASK_CREATED,
+        events.TASK_UPDATED,
+        events.TASK_STATUS_CHANGED,
+        events.LOCK_RELEASED,
+        events.LOCK_EXPIRED,
+    }
+)
+
+# Events that can change a discovery result: the above, plus tasks being
+# taken or removed. Heartbeats and work log entries leave it alone.
+DISCOVERY_EVENTS = AVAILABILITY_EVENTS | {
+    events.LOCK_ACQUIRED,
+    events.TASK_DELETED,
+    events.PROJECT_CHANGED,
+}
+
+
+class DiscoveryCache:
+    """LRU cache of discovery pages, tagged with per-project versions.
+
+    Entries are keyed by the version current when the query started, so a
+    bump makes every older entry for the project unreachable; they are never
+    deleted explicitly and fall out of the LRU. Queries without a project
+    are tagged with the global version, which every bump advances.
+    """
+
+    def __init__(
+        self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._global_version = 0
+        # Advanced by a full reset, which invalidates every project at once
+        self._generation = 0
+
+    def version(self, project_id: uuid.UUID | str | None) -> tuple[int, int]:
+        if project_id is None:
+            return self._generation, self._global_version
+        return self._generation, self._versions.get(str(project_id), 0)
+
+    def bump(self, project_id: uuid.UUID | str | None) -> None:
+        if project_id is None:
+            self._generation += 1
+            self._entries.clear()
+        else:
+            key = str(project_id)
+            self._versions[key] = self._versions.get(key, 0) + 1
+        self._global_version += 1
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        project_id: uuid.UUID | None,
+        load: Callable[[], Awaitable[T]],
+    ) -> T:
+        full_key = (key, project_id, self.version(project_id))
+        now = time.monotonic()
+        hit = self._entries.get(full_key)
+        if hit is not None and hit[0] > now:
+            self._entries.move_to_end(full_key)
+            return hit[1]
+
+        value = await load()
+        self._entries[full_key] = (now + self.ttl, value)
+        self._entries.move_to_end(full_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+
+cache = DiscoveryCache()
+events.listener.add_change_handler(cache.bump, DISCOVERY_EVENTS)
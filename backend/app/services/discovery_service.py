@@ -1,132 +1,327 @@
+import asyncio
 import uuid
+from datetime import datetime, timezone
 
-from sqlalchemy import select
+from sqlalchemy import func, or_, select, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.base import Status
-from app.models.task import Task
+from app.exceptions import ChorusError
+from app.models.base import LockPurpose, Status, TaskType
+from app.models.lock import TaskLock
+from app.models.task import (
+    BACKLOG_PREDICATE,
+    NEEDS_BREAKDOWN_PREDICATE,
+    NEEDS_SIZING_PREDICATE,
+    Task,
+)
+from app.schemas.discovery import ScheduleMode
+from app.services import events
+from app.services.discovery_cache import AVAILABILITY_EVENTS, cache
 from app.services.task_service import (
-    _task_load_options,
-    compute_readiness,
-    enrich_task,
-    is_locked,
+    _load_options,
+    enrich_tasks,
 )
+from app.services.pagination import decode_cursor, encode_cursor
+
+
+def _sort_order():
+    """Discovery ordering: smallest effective_points first, unsized last."""
+    return (Task.effective_points.asc().nulls_last(), Task.created_at, Task.id)
 
 
-def _sort_key(enriched: dict):
-    ep = enriched["effective_points"]
-    return (ep if ep is not None else float("inf"), enriched["created_at"], enriched["id"])
+def _is_locked_clause():
+    return (
+        select(TaskLock.id)
+        .where(TaskLock.task_id == Task.id, TaskLock.expires_at > func.now())
+        .exists()
+    )
+
 
+def _decode_sort_cursor(cursor: str) -> tuple[int | None, datetime, uuid.UUID]:
+    try:
+        effective_points, created_at, task_id = decode_cursor(cursor)
+        return (
+            None if effective_points is None else int(effective_points),
+            datetime.fromisoformat(created_at),
+            uuid.UUID(task_id),
+        )
+    except (AttributeError, TypeError, ValueError):
+        raise ChorusError(400, "VALIDATION_ERROR", "Invalid cursor")
 
-async def _load_project_tasks(
-    session: AsyncSession, project_id: uuid.UUID, *filters
-) -> list[Task]:
+
+async def _fetch(session: AsyncSession, filters: list, limit: int, offset: int = 0):
     stmt = (
         select(Task)
-        .where(Task.project_id == project_id, *filters)
-        .options(*_task_load_options())
+        .where(*filters)
+        .options(*_load_options("lock"))
+        .order_by(*_sort_order())
+        .limit(limit)
+        .offset(offset)
     )
     result = await session.execute(stmt)
     return list(result.scalars().all())
 
 
-async def get_backlog(
-    session: AsyncSession, project_id: uuid.UUID, limit: int = 50, offset: int = 0
-) -> list[dict]:
-    tasks = await _load_project_tasks(session, project_id, Task.status == Status.todo)
-    enriched = [enrich_task(t) for t in tasks]
-    enriched = [e for e in enriched if e["readiness"] == "ready"]
-    enriched.sort(key=_sort_key)
-    return enriched[offset : offset + limit]
-
+async def _load_page(
+    session: AsyncSession,
+    *filters,
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> tuple[list[Task], str | None]:
+    """Filter, sort and paginate in the database; only the page is loaded.
 
-async def get_in_progress(
-    session: AsyncSession, project_id: uuid.UUID, limit: int = 50, offset: int = 0
-) -> list[dict]:
-    tasks = await _load_project_tasks(session, project_id, Task.status == Status.doing)
-    result = []
-    for t in tasks:
-        e = enrich_task(t)
-        if t.lock and is_locked(t):
-            e["lock_caller_label"] = t.lock.caller_label
-            e["lock_purpose"] = t.lock.lock_purpose.value if hasattr(t.lock.lock_purpose, "value") else t.lock.lock_purpose
-            e["lock_expires_at"] = t.lock.expires_at
+    With a cursor, the page starts after the encoded sort key. A row
+    comparison on (effective_points, created_at, id) is an index condition,
+    but it never matches NULL effective_points, so the unsized tail that
+    sorts last is fetched separately once the sized rows run out.
+    Returns the page and the cursor for the next one, if any.
+    """
+    filters = list(filters)
+    if cursor is None:
+        tasks = await _fetch(session, filters, limit + 1, offset)
+    else:
+        effective_points, created_at, task_id = _decode_sort_cursor(cursor)
+        if effective_points is None:
+            tasks = await _fetch(
+                session,
+                filters
+                + [
+                    Task.effective_points.is_(None),
+                    tuple_(Task.created_at, Task.id) > (created_at, task_id),
+                ],
+                limit + 1,
+            )
         else:
-            e["lock_caller_label"] = None
-            e["lock_purpose"] = None
-            e["lock_expires_at"] = None
-        result.append(e)
-    result.sort(key=_sort_key)
-    return result[offset : offset + limit]
+            tasks = await _fetch(
+                session,
+                filters
+                + [
+                    tuple_(Task.effective_points, Task.created_at, Task.id)
+                    > (effective_points, created_at, task_id)
+                ],
+                limit + 1,
+            )
+            if len(tasks) <= limit:
+                tasks += await _fetch(
+                    session,
+                    filters + [Task.effective_points.is_(None)],
+                    limit + 1 - len(tasks),
+                )
 
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        last = tasks[-1]
+        next_cursor = encode_cursor(
+            [last.effective_points, last.created_at.isoformat(), last.id]
+        )
+    return tasks, next_cursor
 
-async def get_needs_refinement(
-    session: AsyncSession, project_id: uuid.UUID, limit: int = 50, offset: int = 0
-) -> list[dict]:
-    from sqlalchemy import or_
-
-    tasks = await _load_project_tasks(
-        session,
-        project_id,
-        or_(Task.needs_refinement == True, Task.sizing_confidence.isnot(None)),  # noqa: E712
-    )
-    enriched = []
-    for t in tasks:
-        e = enrich_task(t)
-        if t.needs_refinement or (t.sizing_confidence is not None and t.sizing_confidence <= 2):
-            enriched.append(e)
-    enriched.sort(key=_sort_key)
-    return enriched[offset : offset + limit]
 
-
-async def get_available(
-    session: AsyncSession,
+def available_filters(
     operation: str,
     project_id: uuid.UUID | None = None,
-    task_type: str | None = None,
+    task_type: TaskType | None = None,
     min_points: int | None = None,
     max_points: int | None = None,
-    limit: int = 50,
-    offset: int = 0,
-) -> list[dict]:
+) -> list | None:
+    """SQL predicates for unlocked tasks eligible for an operation.
+
+    Every filter is a predicate on an indexed column: task_type leads the
+    *_type queue indexes and point bounds are ranges on effective_points.
+    Returns None when nothing can match (unknown operation).
+    """
     filters = []
     if project_id:
         filters.append(Task.project_id == project_id)
 
     if operation == "sizing":
-        filters.append(Task.points.is_(None))
-        stmt = select(Task).where(*filters).options(*_task_load_options())
-        result = await session.execute(stmt)
-        tasks = list(result.scalars().all())
         # Only leaf tasks (no children)
-        tasks = [t for t in tasks if not t.children]
+        filters.append(text(NEEDS_SIZING_PREDICATE))
     elif operation == "breakdown":
-        filters.append(Task.status == Status.todo)
-        stmt = select(Task).where(*filters).options(*_task_load_options())
-        result = await session.execute(stmt)
-        tasks = list(result.scalars().all())
-        tasks = [t for t in tasks if compute_readiness(t) == "needs_breakdown"]
+        filters.append(text(NEEDS_BREAKDOWN_PREDICATE))
     elif operation == "implementation":
-        filters.append(Task.status == Status.todo)
-        stmt = select(Task).where(*filters).options(*_task_load_options())
-        result = await session.execute(stmt)
-        tasks = list(result.scalars().all())
-        tasks = [t for t in tasks if compute_readiness(t) == "ready"]
+        filters.append(text(BACKLOG_PREDICATE))
     else:
-        return []
+        return None
 
     # Exclude locked tasks
-    tasks = [t for t in tasks if not is_locked(t)]
-
-    enriched = [enrich_task(t) for t in tasks]
+    filters.append(~_is_locked_clause())
 
     # Apply optional filters
     if task_type:
-        enriched = [e for e in enriched if e["task_type"].value == task_type or e["task_type"] == task_type]
+        filters.append(Task.task_type == task_type)
     if min_points is not None:
-        enriched = [e for e in enriched if e["effective_points"] is not None and e["effective_points"] >= min_points]
+        filters.append(Task.effective_points >= min_points)
     if max_points is not None:
-        enriched = [e for e in enriched if e["effective_points"] is not None and e["effective_points"] <= max_points]
+        filters.append(Task.effective_points <= max_points)
+    return filters
+
+
+async def get_backlog(
+    session: AsyncSession,
+    project_id: uuid.UUID,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    async def load():
+        tasks, next_cursor = await _load_page(
+            session,
+            Task.project_id == project_id,
+            text(BACKLOG_PREDICATE),
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+        return enrich_tasks(tasks), next_cursor
+
+    return await cache.get_or_load(
+        ("backlog", limit, offset, cursor), project_id, load
+    )
+
+
+async def get_in_progress(
+    session: AsyncSession,
+    project_id: uuid.UUID,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    async def load():
+        tasks, next_cursor = await _load_page(
+            session,
+            Task.project_id == project_id,
+            Task.status == Status.doing,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+        return enrich_tasks(tasks), next_cursor
+
+    page, next_cursor = await cache.get_or_load(
+        ("in_progress", limit, offset, cursor), project_id, load
+    )
+    # Lock fields move with every heartbeat, so they're read fresh rather
+    # than cached with the page
+    result = await session.execute(
+        select(TaskLock).where(
+            TaskLock.task_id.in_([e["id"] for e in page]),
+            TaskLock.expires_at > datetime.now(timezone.utc),
+        )
+    )
+    locks = {lock.task_id: lock for lock in result.scalars().all()}
+    tasks = []
+    for e in page:
+        lock = locks.get(e["id"])
+        tasks.append(
+            {
+                **e,
+                "lock_caller_label": lock.caller_label if lock else None,
+                "lock_purpose": LockPurpose(lock.lock_purpose).value if lock else None,
+                "lock_expires_at": lock.expires_at if lock else None,
+            }
+        )
+    return tasks, next_cursor
+
+
+async def get_needs_refinement(
+    session: AsyncSession,
+    project_id: uuid.UUID,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    async def load():
+        tasks, next_cursor = await _load_page(
+            session,
+            Task.project_id == project_id,
+            or_(Task.needs_refinement == True, Task.sizing_confidence <= 2),  # noqa: E712
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
+        return enrich_tasks(tasks), next_cursor
+
+    return await cache.get_or_load(
+        ("needs_refinement", limit, offset, cursor), project_id, load
+    )
+
+
+async def get_available(
+    session: AsyncSession,
+    operation: str,
+    project_id: uuid.UUID | None = None,
+    task_type: TaskType | None = None,
+    min_points: int | None = None,
+    max_points: int | None = None,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: str | None = None,
+    schedule: ScheduleMode = ScheduleMode.priority,
+) -> tuple[list[dict], str | None]:
+    filters = available_filters(operation, project_id, task_type, min_points, max_points)
+    if filters is None:
+        return [], None
+
+    if schedule == ScheduleMode.fair:
+        from app.services import scheduler_service
+
+        # The fair order depends on scheduler state, so it has no stable keyset
+        if offset or cursor:
+            raise ChorusError(
+                400,
+                "VALIDATION_ERROR",
+                "offset and cursor are not supported with schedule=fair",
+            )
+
+        async def load():
+            tasks = await scheduler_service.get_fair_available(
+                session, operation, project_id, task_type, min_points, max_points, limit
+            )
+            return enrich_tasks(tasks), None
+    else:
+
+        async def load():
+            tasks, next_cursor = await _load_page(
+                session, *filters, limit=limit, offset=offset, cursor=cursor
+            )
+            return enrich_tasks(tasks), next_cursor
+
+    key = (
+        "available", operation, task_type, min_points, max_points,
+        limit, offset, cursor, schedule,
+    )
+    return await cache.get_or_load(key, project_id, load)
+
+
+async def wait_for_available(
+    session: AsyncSession,
+    wait: float,
+    operation: str,
+    project_id: uuid.UUID | None = None,
+    **kwargs,
+) -> tuple[list[dict], str | None]:
+    """get_available, parking for up to `wait` seconds while it is empty.
+
+    The subscription is taken before the first query so a notification
+    committed in between still wakes us. The read transaction is ended
+    before parking so the request doesn't hold a pooled connection.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+
+    def wakes(event: dict) -> bool:
+        # After a reset, events were dropped and any of them could matter
+        return event.get("kind") in AVAILABILITY_EVENTS or event.get("kind") == events.RESET
 
-    enriched.sort(key=_sort_key)
-    return enriched[offset : offset + limit]
+    with events.listener.subscribe(project_id) as queue:
+        while True:
+            page = await get_available(session, operation, project_id, **kwargs)
+            remaining = deadline - loop.time()
+            if page[0] or remaining <= 0:
+                return page
+            await session.commit()
+            # On timeout the loop re-queries once more and returns.
+            await events.wait_for(queue, wakes, remaining)
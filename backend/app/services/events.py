@@ -0,0 +1,379 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import AsyncIterator, Callable, Collection, Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+from sqlalchemy import Select, Text, cast, delete, func, insert, literal, null, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import make_url
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.event import ProjectEvent
+from app.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "chorus_events"
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_DELETED = "task.deleted"
+TASK_STATUS_CHANGED = "task.status_changed"
+LOCK_ACQUIRED = "lock.acquired"
+LOCK_HEARTBEAT = "lock.heartbeat"
+LOCK_RELEASED = "lock.released"
+LOCK_EXPIRED = "lock.expired"
+WORK_LOG_APPENDED = "work_log.appended"
+# Not recorded or streamed; only invalidates caches for the project.
+PROJECT_CHANGED = "project.changed"
+
+# Sent instead of a replay when events after Last-Event-ID were pruned;
+# the client should refetch its state.
+RESET = "reset"
+
+RECONNECT_DELAY_SECONDS = 5
+KEEPALIVE_SECONDS = 15
+
+# How long events stay available for Last-Event-ID resume.
+EVENT_RETENTION = timedelta(hours=1)
+
+# Ids are assigned at insert, not at commit, so event N can become visible
+# after N+1 was streamed. A resume replays this many ids before
+# Last-Event-ID as well, and clients drop the ids they have already seen.
+REPLAY_LOOKBACK_EVENTS = 100
+
+# Per-subscriber buffer; a subscriber that falls this far behind misses
+# events rather than growing without bound.
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+async def publish(
+    session: AsyncSession,
+    kind: str,
+    task_ids: Iterable[uuid.UUID] | Select,
+    data: dict | None = None,
+) -> None:
+    """Record one event per task and queue its notification.
+
+    The event rows and the NOTIFY share the caller's transaction, so
+    listeners never hear about writes that are rolled back. The project id
+    is read in the same statement, so callers only need the task ids,
+    either as values or as a select of ids for sets too large to bind.
+    """
+    if not isinstance(task_ids, Select):
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+    inserted = (
+        insert(ProjectEvent)
+        .from_select(
+            ["project_id", "task_id", "kind", "data"],
+            select(Task.project_id, Task.id, literal(kind), _data_value(data)).where(
+                Task.id.in_(task_ids)
+            ),
+        )
+        .returning(
+            ProjectEvent.id,
+            ProjectEvent.project_id,
+            ProjectEvent.task_id,
+            ProjectEvent.kind,
+            ProjectEvent.data,
+        )
+        .cte("inserted")
+    )
+    payload = func.json_build_object(
+        "id", inserted.c.id,
+        "kind", inserted.c.kind,
+        "project_id", inserted.c.project_id,
+        "task_id", inserted.c.task_id,
+        "data", inserted.c.data,
+    )
+    result = await session.execute(
+        select(inserted.c.project_id, func.pg_notify(CHANNEL, cast(payload, Text)))
+    )
+    _mark_changed(session, kind, result.scalars().all())
+
+
+async def notify(
+    session: AsyncSession,
+    kind: str,
+    task_ids: Iterable[uuid.UUID],
+    data: dict | None = None,
+) -> None:
+    """Queue a notification per task without recording an event row.
+
+    For chatty, short-lived signals such as heartbeats, where nothing needs
+    to be replayed. They carry no id, so they are streamed live but can't
+    be resumed from Last-Event-ID.
+    """
+    task_ids = list(task_ids)
+    if not task_ids:
+        return
+    payload = func.json_build_object(
+        "kind", literal(kind),
+        "project_id", Task.project_id,
+        "task_id", Task.id,
+        "data", _data_value(data),
+    )
+    result = await session.execute(
+        select(Task.project_id, func.pg_notify(CHANNEL, cast(payload, Text))).where(
+            Task.id.in_(task_ids)
+        )
+    )
+    _mark_changed(session, kind, result.scalars().all())
+
+
+async def publish_project_changed(session: AsyncSession, project_id: uuid.UUID) -> None:
+    """Announce a project-level change that has no task rows to attach to."""
+    payload = json.dumps({"kind": PROJECT_CHANGED, "project_id": str(project_id)})
+    await session.execute(select(func.pg_notify(CHANNEL, payload)))
+    _mark_changed(session, PROJECT_CHANGED, [project_id])
+
+
+def _data_value(data: dict | None):
+    if data is None:
+        return null()
+    return literal(json.loads(json.dumps(data, default=str)), JSONB)
+
+
+def _mark_changed(
+    session: AsyncSession, kind: str, project_ids: Iterable[uuid.UUID]
+) -> None:
+    session.info.setdefault("changed_projects", set()).update(
+        (str(pid), kind) for pid in project_ids
+    )
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    # Change handlers also hear our own NOTIFY, but only once the listener
+    # connection receives it; tell them now so this process reads its writes.
+    for project_id, kind in session.info.pop("changed_projects", ()):
+        listener.changed(project_id, kind)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop("changed_projects", None)
+
+
+async def cleanup_expired_events(session: AsyncSession, limit: int = 500) -> int:
+    cutoff = datetime.now(timezone.utc) - EVENT_RETENTION
+    expired = (
+        select(ProjectEvent.id)
+        .where(ProjectEvent.created_at < cutoff)
+        .order_by(ProjectEvent.id)
+        .limit(limit)
+    )
+    result = await session.execute(
+        delete(ProjectEvent).where(ProjectEvent.id.in_(expired.scalar_subquery()))
+    )
+    return result.rowcount
+
+
+class EventListener:
+    """A single LISTEN connection fanned out to in-process subscribers."""
+
+    def __init__(self) -> None:
+        # Each subscriber's queue and the project it follows (None for all)
+        self._subscribers: dict[asyncio.Queue, str | None] = {}
+        self._change_handlers: list[
+            tuple[Callable[[str | None], None], Collection[str] | None]
+        ] = []
+
+    def add_change_handler(
+        self,
+        handler: Callable[[str | None], None],
+        kinds: Collection[str] | None = None,
+    ) -> None:
+        """Call handler(project_id) whenever a project's data may have changed.
+
+        With kinds, only events of those kinds call it. project_id is None
+        when anything may have changed, e.g. after the connection was
+        re-established and notifications may have been missed; that always
+        calls every handler.
+        """
+        self._change_handlers.append((handler, kinds))
+
+    def changed(self, project_id: str | None, kind: str | None = None) -> None:
+        for handler, kinds in self._change_handlers:
+            if kind is None or kinds is None or kind in kinds:
+                handler(project_id)
+
+    @contextmanager
+    def subscribe(self, project_id: uuid.UUID | None = None) -> Iterator[asyncio.Queue]:
+        """Queue the events of one project, or of all projects.
+
+        A subscriber that falls SUBSCRIBER_QUEUE_SIZE events behind has its
+        backlog replaced by a single RESET event, so it knows to resync
+        instead of silently missing events.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[queue] = None if project_id is None else str(project_id)
+        try:
+            yield queue
+        finally:
+            self._subscribers.pop(queue, None)
+
+    def _dispatch(self, connection, pid, channel, payload) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed notification: %r", payload)
+            return
+        # Handlers run first so woken subscribers never see stale caches.
+        project_id = event.get("project_id")
+        self.changed(project_id, event.get("kind"))
+        for queue, followed in self._subscribers.items():
+            if followed is not None and followed != project_id:
+                continue
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                _overflow(queue, project_id)
+
+    async def run(self, dsn: str) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._dispatch)
+                self.changed(None)
+                await closed.wait()
+                logger.warning("Event listener connection closed, reconnecting")
+            except asyncio.CancelledError:
+                if connection is not None:
+                    await connection.close()
+                raise
+            except Exception:
+                logger.exception("Error in event listener")
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+
+def _overflow(queue: asyncio.Queue, project_id: str | None) -> None:
+    while not queue.empty():
+        queue.get_nowait()
+    queue.put_nowait({"kind": RESET, "project_id": project_id})
+
+
+listener = EventListener()
+
+
+async def wait_for(
+    queue: asyncio.Queue, predicate: Callable[[dict], bool], timeout: float
+) -> bool:
+    """Wait until an event matching predicate arrives; False on timeout."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return False
+        try:
+            event = await asyncio.wait_for(queue.get(), remaining)
+        except TimeoutError:
+            return False
+        if predicate(event):
+            return True
+
+
+def _event_dict(event: ProjectEvent) -> dict:
+    return {
+        "id": event.id,
+        "kind": event.kind,
+        "project_id": str(event.project_id),
+        "task_id": str(event.task_id),
+        "data": event.data,
+    }
+
+
+def format_sse(event: dict) -> str:
+    body = {"task_id": event.get("task_id")}
+    if event.get("data"):
+        body.update(event["data"])
+    # Notify-only events have no id; the client keeps its last one
+    frame_id = f"id: {event['id']}\n" if "id" in event else ""
+    return f"{frame_id}event: {event['kind']}\ndata: {json.dumps(body)}\n\n"
+
+
+async def _replay(
+    session: AsyncSession, project_id: uuid.UUID, last_event_id: int
+) -> list[dict] | None:
+    """Events from the look-back window on, or None if some may have been pruned."""
+    oldest = (await session.execute(select(func.min(ProjectEvent.id)))).scalar()
+    if oldest is None:
+        # Everything was cleaned up; only an id we never issued means a gap
+        issued = (
+            await session.execute(
+                text(
+                    "SELECT pg_sequence_last_value("
+                    "pg_get_serial_sequence('project_events', 'id')::regclass)"
+                )
+            )
+        ).scalar()
+        return [] if last_event_id <= (issued or 0) else None
+    if oldest > last_event_id + 1:
+        return None
+    result = await session.execute(
+        select(ProjectEvent)
+        .where(
+            ProjectEvent.project_id == project_id,
+            ProjectEvent.id > last_event_id - REPLAY_LOOKBACK_EVENTS,
+        )
+        .order_by(ProjectEvent.id)
+    )
+    return [_event_dict(e) for e in result.scalars().all()]
+
+
+async def stream_project_events(
+    session: AsyncSession, project_id: uuid.UUID, last_event_id: int | None = None
+) -> AsyncIterator[str]:
+    """SSE frames for a project: the replay around last_event_id, then live events.
+
+    The subscription is taken before the replay query so nothing committed
+    in between is lost; live events already replayed are skipped. The
+    session is released after the replay and not used while streaming.
+    """
+    with listener.subscribe(project_id) as queue:
+        replayed: set[int] = set()
+        if last_event_id is not None:
+            backlog = await _replay(session, project_id, last_event_id)
+            if backlog is None:
+                yield f"event: {RESET}\ndata: {{}}\n\n"
+                backlog = []
+            for event in backlog:
+                replayed.add(event["id"])
+                yield format_sse(event)
+        await session.commit()
+
+        project = str(project_id)
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event.get("kind") == RESET:
+                # We fell behind and events were dropped; the client resyncs
+                yield f"event: {RESET}\ndata: {{}}\n\n"
+                continue
+            if event.get("project_id") != project or event.get("task_id") is None:
+                continue
+            if event.get("id") in replayed:
+                continue
+            yield format_sse(event)
+
+
+def start_event_listener(database_url: str):
+    dsn = make_url(database_url).set(drivername="postgresql")
+    return asyncio.create_task(
+        listener.run(dsn.render_as_string(hide_password=False))
+    )
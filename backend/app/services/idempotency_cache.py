@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+IDEMPOTENCY_CACHE_MAX_ENTRIES = 10_000
+
+
+class IdempotencyCache:
+    """LRU of stored responses by scoped key, each kept until its record expires.
+
+    A stored response never changes, so entries need no invalidation; the
+    cache only has to forget them when the record would have expired.
+    """
+
+    def __init__(self, max_entries: int = IDEMPOTENCY_CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[datetime, int, dict]] = OrderedDict()
+
+    def get(self, key: str) -> tuple[int, dict] | None:
+        hit = self._entries.get(key)
+        if hit is None:
+            return None
+        expires_at, status_code, response_body = hit
+        if expires_at <= datetime.now(timezone.utc):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return status_code, response_body
+
+    def put(
+        self, key: str, status_code: int, response_body: dict, expires_at: datetime
+    ) -> None:
+        self._entries[key] = (expires_at, status_code, response_body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+cache = IdempotencyCache()
+
+
+def put_after_commit(
+    session, key: str, status_code: int, response_body: dict, expires_at: datetime
+) -> None:
+    """Cache a response once the transaction storing it commits."""
+    session.info.setdefault("idempotency_pending", []).append(
+        (key, status_code, response_body, expires_at)
+    )
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    for key, status_code, response_body, expires_at in session.info.pop(
+        "idempotency_pending", ()
+    ):
+        cache.put(key, status_code, response_body, expires_at)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop("idempotency_pending", None)
@@ -1,17 +1,54 @@
 import asyncio
+import heapq
 import logging
+import os
 import uuid
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import delete, select
+from sqlalchemy import (
+    DateTime,
+    String,
+    Uuid,
+    and_,
+    case,
+    column,
+    delete,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    text,
+    true,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.exceptions import ChorusError
-from app.models.base import LockPurpose
+from app.models.base import LockPurpose, lock_purpose_enum
 from app.models.lock import TaskLock
 from app.models.task import Task
-from app.schemas.lock import LockAcquireRequest
-from app.services import task_service
+from app.schemas.discovery import ScheduleMode
+from app.schemas.lock import (
+    ClaimRequest,
+    LockAcquireRequest,
+    LockBatchAction,
+    LockBatchItem,
+    LockBatchMode,
+    LockBatchRequest,
+)
+from app.services import (
+    discovery_service,
+    events,
+    maintenance,
+    scheduler_service,
+    task_service,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,18 +59,42 @@ LOCK_TTL: dict[LockPurpose, timedelta] = {
     LockPurpose.implementation: timedelta(hours=1),
 }
 
+# Storage for task_locks: "logged" (default) or "unlogged". Unlogged lock
+# rows bypass the WAL, so heartbeats cost no durable write, but Postgres
+# empties the table after a crash and doesn't replicate it to standbys;
+# holders then get 404 on their next heartbeat and re-acquire.
+LOCK_STORAGE = os.environ.get("LOCK_STORAGE", "logged")
+LOCK_STORAGE_PERSISTENCE = {"logged": "p", "unlogged": "u"}
+
+# Sweep interval for expired events, which nothing waits on
 CLEANUP_INTERVAL_SECONDS = 60
 
+# Rows deleted per cleanup transaction, so a large backlog never turns into
+# one long delete holding locks on the whole set
+CLEANUP_BATCH_SIZE = 500
+
+# Upcoming lock expiries the reaper keeps in memory
+REAPER_HEAP_SIZE = 1000
+# Longest the reaper sleeps before rechecking the table; bounds how late it
+# notices expiries it wasn't told about, e.g. from other processes' heartbeats
+REAPER_MAX_SLEEP_SECONDS = 60
+# Added to each wake-up so the lock has strictly expired when we look
+REAPER_SLACK_SECONDS = 0.1
+
+# Candidates tried by claim_task before giving up; each attempt only loses
+# to a concurrent acquire_lock on the same task, which SKIP LOCKED can't see.
+CLAIM_MAX_ATTEMPTS = 5
+
 
 def validate_lock_precondition(task: Task, purpose: LockPurpose) -> None:
     if purpose == LockPurpose.sizing:
         if task.points is not None:
             raise ChorusError(422, "INVALID_READINESS_STATE", "Task is already sized")
     elif purpose == LockPurpose.breakdown:
-        if task.points is None and not task.children:
+        if task.points is None and not task.children_count:
             raise ChorusError(422, "INVALID_READINESS_STATE", "Task must be sized before breakdown")
-        ep = task_service.compute_effective_points(task)
-        unsized = task_service.compute_unsized_children(task)
+        ep = task.effective_points
+        unsized = task.unsized_children
         if (ep is None or ep <= 6) and unsized == 0:
             raise ChorusError(
                 422,
@@ -41,7 +102,7 @@ def validate_lock_precondition(task: Task, purpose: LockPurpose) -> None:
                 "Task does not need breakdown (effective_points <= 6 and no unsized children)",
             )
     elif purpose == LockPurpose.implementation:
-        readiness = task_service.compute_readiness(task)
+        readiness = task.readiness
         if readiness != "ready":
             raise ChorusError(
                 422,
@@ -52,35 +113,232 @@ def validate_lock_precondition(task: Task, purpose: LockPurpose) -> None:
     # refinement: no precondition
 
 
+def lock_precondition_clause(purpose: LockPurpose):
+    """validate_lock_precondition as a SQL predicate on the stored rollups."""
+    if purpose == LockPurpose.sizing:
+        return Task.points.is_(None)
+    if purpose == LockPurpose.breakdown:
+        return and_(
+            or_(Task.points.is_not(None), Task.children_count > 0),
+            or_(Task.effective_points > 6, Task.unsized_children > 0),
+        )
+    if purpose == LockPurpose.implementation:
+        return Task.readiness == "ready"
+    return true()
+
+
+async def configure_lock_storage(
+    session: AsyncSession, storage: str = LOCK_STORAGE
+) -> bool:
+    """Switch task_locks to the configured storage. Returns whether it changed.
+
+    The table is only rewritten when its persistence differs, so restarts
+    with an unchanged setting don't lock it.
+    """
+    if storage not in LOCK_STORAGE_PERSISTENCE:
+        raise ValueError(
+            f"LOCK_STORAGE must be one of {', '.join(LOCK_STORAGE_PERSISTENCE)}, got {storage!r}"
+        )
+    result = await session.execute(
+        text("SELECT relpersistence::text FROM pg_class WHERE oid = 'task_locks'::regclass")
+    )
+    if result.scalar_one() == LOCK_STORAGE_PERSISTENCE[storage]:
+        return False
+    await session.execute(text(f"ALTER TABLE task_locks SET {storage.upper()}"))
+    logger.info("Switched task_locks to %s storage", storage)
+    return True
+
+
 async def acquire_lock(
     session: AsyncSession, task_id: uuid.UUID, data: LockAcquireRequest
 ) -> TaskLock:
-    task = await task_service.get_task(session, task_id)
+    """Lock a task in one statement.
+
+    The task row, its precondition and any expired lock are all checked by
+    a single INSERT ... SELECT ... ON CONFLICT DO UPDATE, so concurrent
+    acquirers are serialised by the unique index instead of racing on it.
+    Only when nothing is returned is the reason looked up.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = insert(TaskLock).from_select(
+        _LOCK_COLUMNS,
+        select(
+            Task.id,
+            literal(data.caller_label),
+            literal(data.lock_purpose, lock_purpose_enum),
+            literal(now),
+            null(),
+            literal(now + LOCK_TTL[data.lock_purpose]),
+        ).where(Task.id == task_id, lock_precondition_clause(data.lock_purpose)),
+    )
+    lock = (await session.execute(_take_over_expired(stmt))).scalar_one_or_none()
+    if lock is None:
+        await _explain_acquire_failure(session, task_id, data.lock_purpose)
+    await _publish_acquired(session, lock)
+    return lock
+
+
+async def _explain_acquire_failure(
+    session: AsyncSession, task_id: uuid.UUID, purpose: LockPurpose
+) -> None:
+    task = await task_service.get_task(session, task_id, "lock")
+    if task_service.is_locked(task):
+        raise ChorusError(409, "LOCK_CONFLICT", "Task is already locked")
+    validate_lock_precondition(task, purpose)
+    # The lock was released or the task changed after the insert ran
+    raise ChorusError(409, "LOCK_CONFLICT", "Task changed concurrently, retry")
+
+
+async def _publish_acquired(session: AsyncSession, lock: TaskLock) -> None:
+    await events.publish(
+        session,
+        events.LOCK_ACQUIRED,
+        [lock.task_id],
+        {"caller_label": lock.caller_label, "purpose": LockPurpose(lock.lock_purpose).value},
+    )
+
+
+_LOCK_COLUMNS = [
+    "task_id", "caller_label", "lock_purpose", "acquired_at", "last_heartbeat_at", "expires_at"
+]
+
+
+def _take_over_expired(stmt):
+    """Turn a lock INSERT into an upsert that only replaces expired locks."""
+    return (
+        stmt.on_conflict_do_update(
+            index_elements=[TaskLock.task_id],
+            set_={column: stmt.excluded[column] for column in _LOCK_COLUMNS[1:]},
+            where=TaskLock.expires_at < func.now(),
+        )
+        .returning(TaskLock)
+        .execution_options(populate_existing=True)
+    )
 
-    # Check existing lock
-    result = await session.execute(select(TaskLock).where(TaskLock.task_id == task_id))
-    existing = result.scalar_one_or_none()
-    if existing:
-        now = datetime.now(timezone.utc)
-        if existing.expires_at < now:
-            await session.delete(existing)
-            await session.flush()
-        else:
-            raise ChorusError(409, "LOCK_CONFLICT", "Task is already locked")
 
-    validate_lock_precondition(task, data.lock_purpose)
+async def _insert_locks(
+    session: AsyncSession, requests: list[tuple[uuid.UUID, str, LockPurpose]]
+) -> list[TaskLock]:
+    """Insert locks in one statement, taking over expired ones.
 
+    requests are (task_id, caller_label, purpose). Only the locks won are
+    returned; a task whose lock is still active is skipped.
+    """
     now = datetime.now(timezone.utc)
-    lock = TaskLock(
-        task_id=task_id,
-        caller_label=data.caller_label,
-        lock_purpose=data.lock_purpose,
-        acquired_at=now,
-        expires_at=now + LOCK_TTL[data.lock_purpose],
-    )
-    session.add(lock)
-    await session.flush()
-    return lock
+    stmt = insert(TaskLock).values(
+        [
+            dict(
+                zip(
+                    _LOCK_COLUMNS,
+                    (task_id, caller_label, purpose, now, None, now + LOCK_TTL[purpose]),
+                )
+            )
+            for task_id, caller_label, purpose in requests
+        ]
+    )
+    result = await session.execute(_take_over_expired(stmt))
+    return list(result.scalars().all())
+
+
+async def _insert_lock(
+    session: AsyncSession,
+    task_id: uuid.UUID,
+    caller_label: str,
+    purpose: LockPurpose,
+) -> TaskLock | None:
+    """Insert a lock, taking over an expired one. Returns None if an active lock exists."""
+    locks = await _insert_locks(session, [(task_id, caller_label, purpose)])
+    return locks[0] if locks else None
+
+
+async def _claim_first(
+    session: AsyncSession, filters: list, purpose: LockPurpose, caller_label: str
+) -> tuple[Task, TaskLock] | None:
+    tried: list[uuid.UUID] = []
+    for _ in range(CLAIM_MAX_ATTEMPTS):
+        stmt = (
+            select(Task)
+            .where(*filters)
+            .order_by(*discovery_service._sort_order())
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if tried:
+            stmt = stmt.where(Task.id.not_in(tried))
+        result = await session.execute(stmt)
+        task = result.scalar_one_or_none()
+        if task is None:
+            return None
+
+        validate_lock_precondition(task, purpose)
+        lock = await _insert_lock(session, task.id, caller_label, purpose)
+        if lock is not None:
+            await _publish_acquired(session, lock)
+            await session.refresh(task, ["lock"])
+            return task, lock
+        tried.append(task.id)
+    return None
+
+
+async def _claim_fair(
+    session: AsyncSession, data: ClaimRequest, filters: list, purpose: LockPurpose
+) -> tuple[Task, TaskLock] | None:
+    operation = data.operation.value
+    scheduler = scheduler_service.get_scheduler(operation)
+    exclude: set[uuid.UUID] = set()
+    for _ in range(CLAIM_MAX_ATTEMPTS):
+        queues = await scheduler_service.load_queues(
+            session,
+            operation,
+            data.project_id,
+            data.task_type,
+            data.min_points,
+            data.max_points,
+            exclude=exclude,
+        )
+        picks, state = scheduler.plan(queues, 1)
+        if not picks:
+            return None
+        project_id = picks[0][0]
+        if await scheduler_service.under_cap(session, project_id, operation):
+            claimed = await _claim_first(
+                session, filters + [Task.project_id == project_id], purpose, data.caller_label
+            )
+            if claimed is not None:
+                scheduler.apply(state)
+                return claimed
+        exclude.add(project_id)
+    return None
+
+
+async def claim_task(
+    session: AsyncSession, data: ClaimRequest
+) -> tuple[Task, TaskLock]:
+    """Pick the best eligible task and lock it in the caller's transaction.
+
+    Candidates are selected with FOR UPDATE SKIP LOCKED, so concurrent
+    claimers each get a different task instead of racing for the same one.
+    With schedule=fair the project is chosen first by the fair-share
+    scheduler, honouring per-project concurrency caps.
+    """
+    filters = discovery_service.available_filters(
+        data.operation.value,
+        data.project_id,
+        data.task_type,
+        data.min_points,
+        data.max_points,
+    )
+    if filters is None:
+        raise ChorusError(404, "NOT_FOUND", "No eligible task available")
+
+    purpose = LockPurpose(data.operation.value)
+    if data.schedule == ScheduleMode.fair:
+        claimed = await _claim_fair(session, data, filters, purpose)
+    else:
+        claimed = await _claim_first(session, filters, purpose, data.caller_label)
+    if claimed is None:
+        raise ChorusError(404, "NOT_FOUND", "No eligible task available")
+    return claimed
 
 
 async def heartbeat_lock(
@@ -102,6 +360,9 @@ async def heartbeat_lock(
     lock.last_heartbeat_at = now
     lock.expires_at = now + LOCK_TTL[purpose]
     await session.flush()
+    await events.notify(
+        session, events.LOCK_HEARTBEAT, [task_id], {"expires_at": lock.expires_at.isoformat()}
+    )
     return lock
 
 
@@ -118,39 +379,394 @@ async def release_lock(
 
     await session.delete(lock)
     await session.flush()
+    await events.publish(session, events.LOCK_RELEASED, [task_id])
+
+
+def _batch_ok(task_id: uuid.UUID, lock: TaskLock | None = None) -> dict:
+    return {"task_id": task_id, "ok": True, "lock": lock, "error": None}
+
 
+def _batch_error(task_id: uuid.UUID, code: str, message: str) -> dict:
+    return {
+        "task_id": task_id,
+        "ok": False,
+        "lock": None,
+        "error": {"code": code, "message": message},
+    }
 
-async def cleanup_expired_locks(session: AsyncSession) -> int:
+
+async def _batch_acquire(
+    session: AsyncSession, items: list[LockBatchItem]
+) -> tuple[dict[uuid.UUID, dict], list[TaskLock]]:
+    """Lock every eligible task in one INSERT ... SELECT, as acquire_lock does.
+
+    The requests are joined to their task rows and filtered by each
+    purpose's lock_precondition_clause, so preconditions are checked in the
+    same statement that takes the lock. Skipped items are explained by one
+    read afterwards.
+    """
     now = datetime.now(timezone.utc)
-    result = await session.execute(delete(TaskLock).where(TaskLock.expires_at < now))
-    return result.rowcount
+    requested = values(
+        column("task_id", Uuid),
+        column("caller_label", String),
+        column("lock_purpose", lock_purpose_enum),
+        column("expires_at", DateTime(timezone=True)),
+        name="requested",
+    ).data(
+        [
+            (item.task_id, item.caller_label, item.lock_purpose, now + LOCK_TTL[item.lock_purpose])
+            for item in items
+        ]
+    )
+    purposes = {item.lock_purpose for item in items}
+    stmt = insert(TaskLock).from_select(
+        _LOCK_COLUMNS,
+        select(
+            requested.c.task_id,
+            requested.c.caller_label,
+            requested.c.lock_purpose,
+            literal(now),
+            null(),
+            requested.c.expires_at,
+        )
+        .join_from(requested, Task, Task.id == requested.c.task_id)
+        .where(
+            or_(
+                *(
+                    and_(requested.c.lock_purpose == purpose, lock_precondition_clause(purpose))
+                    for purpose in purposes
+                )
+            )
+        ),
+    )
+    result = await session.execute(_take_over_expired(stmt))
+    locks = list(result.scalars().all())
 
+    results = {lock.task_id: _batch_ok(lock.task_id, lock) for lock in locks}
+    results |= await _classify_skipped_acquires(
+        session, [item for item in items if item.task_id not in results]
+    )
+    return results, locks
 
-async def cleanup_expired_idempotency_records(session: AsyncSession) -> int:
-    from app.models.idempotency import IdempotencyRecord
 
+async def _classify_skipped_acquires(
+    session: AsyncSession, items: list[LockBatchItem]
+) -> dict[uuid.UUID, dict]:
+    """Explain, with one read, why the batch insert skipped these items."""
+    if not items:
+        return {}
+    result = await session.execute(
+        select(Task)
+        .options(*task_service._load_options("lock"))
+        .where(Task.id.in_([item.task_id for item in items]))
+    )
+    tasks = {task.id: task for task in result.unique().scalars().all()}
+
+    results = {}
+    for item in items:
+        task = tasks.get(item.task_id)
+        if task is None:
+            results[item.task_id] = _batch_error(item.task_id, "NOT_FOUND", "Task not found")
+            continue
+        if task_service.is_locked(task):
+            results[item.task_id] = _batch_error(
+                item.task_id, "LOCK_CONFLICT", "Task is already locked"
+            )
+            continue
+        try:
+            validate_lock_precondition(task, item.lock_purpose)
+        except ChorusError as e:
+            results[item.task_id] = _batch_error(item.task_id, e.code, e.message)
+            continue
+        # The lock was released or the task changed after the insert ran
+        results[item.task_id] = _batch_error(
+            item.task_id, "LOCK_CONFLICT", "Task changed concurrently, retry"
+        )
+    return results
+
+
+async def _classify_missing_locks(
+    session: AsyncSession,
+    items: list[LockBatchItem],
+    check_expiry: bool,
+    check_holder: bool,
+) -> dict[uuid.UUID, dict]:
+    """Explain, with one read, why the set-based write skipped these items."""
+    if not items:
+        return {}
+    result = await session.execute(
+        select(TaskLock).where(TaskLock.task_id.in_([item.task_id for item in items]))
+    )
+    locks = {lock.task_id: lock for lock in result.scalars().all()}
+    now = datetime.now(timezone.utc)
+
+    results = {}
+    for item in items:
+        lock = locks.get(item.task_id)
+        if lock is None:
+            results[item.task_id] = _batch_error(
+                item.task_id, "NOT_FOUND", "No lock found for this task"
+            )
+        elif check_expiry and lock.expires_at < now:
+            results[item.task_id] = _batch_error(
+                item.task_id, "LOCK_CONFLICT", "Lock has expired"
+            )
+        elif check_holder and lock.caller_label != item.caller_label:
+            results[item.task_id] = _batch_error(
+                item.task_id, "VALIDATION_ERROR", "Caller label does not match lock holder"
+            )
+        else:
+            # Changed hands between the write and this read
+            results[item.task_id] = _batch_error(
+                item.task_id, "LOCK_CONFLICT", "Lock changed concurrently"
+            )
+    return results
+
+
+async def _batch_heartbeat(
+    session: AsyncSession, items: list[LockBatchItem]
+) -> tuple[dict[uuid.UUID, dict], list[TaskLock]]:
+    """Extend every held, unexpired lock in one UPDATE."""
+    now = datetime.now(timezone.utc)
+    result = await session.execute(
+        update(TaskLock)
+        .where(
+            tuple_(TaskLock.task_id, TaskLock.caller_label).in_(
+                [(item.task_id, item.caller_label) for item in items]
+            ),
+            TaskLock.expires_at >= now,
+        )
+        .values(
+            last_heartbeat_at=now,
+            expires_at=case(
+                {purpose: now + ttl for purpose, ttl in LOCK_TTL.items()},
+                value=TaskLock.lock_purpose,
+            ),
+        )
+        .returning(TaskLock)
+        .execution_options(populate_existing=True, synchronize_session=False)
+    )
+    locks = list(result.scalars().all())
+    results = {lock.task_id: _batch_ok(lock.task_id, lock) for lock in locks}
+    results |= await _classify_missing_locks(
+        session,
+        [item for item in items if item.task_id not in results],
+        check_expiry=True,
+        check_holder=True,
+    )
+    return results, locks
+
+
+async def _batch_release(
+    session: AsyncSession, items: list[LockBatchItem], force: bool
+) -> tuple[dict[uuid.UUID, dict], list[uuid.UUID]]:
+    """Delete every held lock (any lock with force) in one DELETE."""
+    if force:
+        condition = TaskLock.task_id.in_([item.task_id for item in items])
+    else:
+        condition = tuple_(TaskLock.task_id, TaskLock.caller_label).in_(
+            [(item.task_id, item.caller_label) for item in items]
+        )
+    result = await session.execute(
+        delete(TaskLock)
+        .where(condition)
+        .returning(TaskLock.task_id)
+        .execution_options(synchronize_session=False)
+    )
+    released = list(result.scalars().all())
+    results = {task_id: _batch_ok(task_id) for task_id in released}
+    results |= await _classify_missing_locks(
+        session,
+        [item for item in items if item.task_id not in results],
+        check_expiry=False,
+        check_holder=not force,
+    )
+    return results, released
+
+
+async def _publish_batch(
+    session: AsyncSession, action: LockBatchAction, locks: list, released: list[uuid.UUID]
+) -> None:
+    if action == LockBatchAction.release:
+        await events.publish(session, events.LOCK_RELEASED, released)
+        return
+    # One statement per distinct payload rather than per lock
+    groups: dict[tuple, list[uuid.UUID]] = defaultdict(list)
+    for lock in locks:
+        if action == LockBatchAction.acquire:
+            key = (lock.caller_label, LockPurpose(lock.lock_purpose).value)
+        else:
+            key = (lock.expires_at.isoformat(),)
+        groups[key].append(lock.task_id)
+    for key, task_ids in groups.items():
+        if action == LockBatchAction.acquire:
+            data = {"caller_label": key[0], "purpose": key[1]}
+            await events.publish(session, events.LOCK_ACQUIRED, task_ids, data)
+        else:
+            await events.notify(session, events.LOCK_HEARTBEAT, task_ids, {"expires_at": key[0]})
+
+
+async def batch_locks(session: AsyncSession, data: LockBatchRequest) -> list[dict]:
+    """Acquire, heartbeat or release many locks with a constant number of statements.
+
+    Each action is one set-based write plus at most one read to explain the
+    items it skipped. Results come back in request order. In all_or_nothing
+    mode the writes run in a savepoint that is rolled back if any item
+    fails, and the failures are raised as a 409.
+    """
+    savepoint = await session.begin_nested()
+    locks: list[TaskLock] = []
+    released: list[uuid.UUID] = []
+    if data.action == LockBatchAction.acquire:
+        results, locks = await _batch_acquire(session, data.items)
+    elif data.action == LockBatchAction.heartbeat:
+        results, locks = await _batch_heartbeat(session, data.items)
+    else:
+        results, released = await _batch_release(session, data.items, data.force)
+    ordered = [results[item.task_id] for item in data.items]
+
+    failed = [r for r in ordered if not r["ok"]]
+    if failed and data.mode == LockBatchMode.all_or_nothing:
+        await savepoint.rollback()
+        raise ChorusError(
+            409,
+            "LOCK_CONFLICT",
+            f"{len(failed)} of {len(ordered)} items failed; no changes applied",
+            {"failed": [{"task_id": str(r["task_id"]), **r["error"]} for r in failed]},
+        )
+    await savepoint.commit()
+    await _publish_batch(session, data.action, locks, released)
+    return ordered
+
+
+async def cleanup_expired_locks(
+    session: AsyncSession, limit: int = CLEANUP_BATCH_SIZE
+) -> int:
+    """Delete up to `limit` expired locks, oldest first, and announce them."""
     now = datetime.now(timezone.utc)
+    expired = (
+        select(TaskLock.id)
+        .where(TaskLock.expires_at < now)
+        .order_by(TaskLock.expires_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
     result = await session.execute(
-        delete(IdempotencyRecord).where(IdempotencyRecord.expires_at < now)
+        delete(TaskLock)
+        .where(TaskLock.id.in_(expired.scalar_subquery()))
+        .returning(TaskLock.task_id)
+        .execution_options(synchronize_session=False)
     )
-    return result.rowcount
+    task_ids = list(result.scalars().all())
+    await events.publish(session, events.LOCK_EXPIRED, task_ids)
+    return len(task_ids)
 
 
-async def _cleanup_loop(session_factory):
+async def delete_in_chunks(
+    session_factory,
+    cleanup: Callable[[AsyncSession, int], Awaitable[int]],
+    limit: int = CLEANUP_BATCH_SIZE,
+) -> int:
+    """Run a bounded cleanup in short transactions until it comes up short."""
+    total = 0
     while True:
-        await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
-        try:
-            async with session_factory() as session:
-                lock_count = await cleanup_expired_locks(session)
-                idem_count = await cleanup_expired_idempotency_records(session)
-                await session.commit()
-                if lock_count:
-                    logger.info("Cleaned up %d expired locks", lock_count)
-                if idem_count:
-                    logger.info("Cleaned up %d expired idempotency records", idem_count)
-        except Exception:
-            logger.exception("Error during cleanup")
-
-
-def start_lock_cleanup_task(session_factory):
-    return asyncio.create_task(_cleanup_loop(session_factory))
+        async with session_factory() as session:
+            count = await cleanup(session, limit)
+            await session.commit()
+        total += count
+        if count < limit:
+            return total
+
+
+class LockReaper:
+    """Deletes locks as they expire rather than on a fixed interval.
+
+    Upcoming expiries are kept in a min-heap, loaded from idx_locks_expiry
+    and topped up from lock.acquired and lock.heartbeat notifications, and
+    the reaper sleeps until the earliest one. Entries are only wake-up
+    times: a lock heartbeated since it was queued is left alone by the
+    delete, and the heap is reloaded after every pass and at least every
+    REAPER_MAX_SLEEP_SECONDS. Locks already expired are left out of the
+    reload: the delete skipped them because another transaction holds the
+    row, and retrying at once would spin until it lets go.
+    """
+
+    def __init__(self, session_factory) -> None:
+        self.session_factory = session_factory
+        self.heap: list[datetime] = []
+
+    async def refresh(self) -> None:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(TaskLock.expires_at)
+                .where(TaskLock.expires_at > datetime.now(timezone.utc))
+                .order_by(TaskLock.expires_at)
+                .limit(REAPER_HEAP_SIZE)
+            )
+            # Already in index order, which is a valid heap
+            self.heap = list(result.scalars().all())
+            await session.commit()
+
+    def note(self, event: dict) -> None:
+        data = event.get("data") or {}
+        if event.get("kind") == events.LOCK_ACQUIRED and "purpose" in data:
+            expires_at = datetime.now(timezone.utc) + LOCK_TTL[LockPurpose(data["purpose"])]
+        elif event.get("kind") == events.LOCK_HEARTBEAT and "expires_at" in data:
+            expires_at = datetime.fromisoformat(data["expires_at"])
+        else:
+            return
+        heapq.heappush(self.heap, expires_at)
+        if len(self.heap) > REAPER_HEAP_SIZE:
+            # Only the earliest wake-ups matter; the tail is reloaded later
+            self.heap = heapq.nsmallest(REAPER_HEAP_SIZE, self.heap)
+
+    def next_wake(self) -> float:
+        """Seconds until the reaper should next look at the table."""
+        if not self.heap:
+            return REAPER_MAX_SLEEP_SECONDS
+        delay = (self.heap[0] - datetime.now(timezone.utc)).total_seconds()
+        return min(max(delay, 0) + REAPER_SLACK_SECONDS, REAPER_MAX_SLEEP_SECONDS)
+
+    async def reap(self) -> int:
+        count = await delete_in_chunks(self.session_factory, cleanup_expired_locks)
+        if count:
+            logger.info("Cleaned up %d expired locks", count)
+        await self.refresh()
+        return count
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        with events.listener.subscribe() as queue:
+            while True:
+                try:
+                    await self.reap()
+                    deadline = loop.time() + self.next_wake()
+                    while (remaining := deadline - loop.time()) > 0:
+                        try:
+                            event = await asyncio.wait_for(queue.get(), remaining)
+                        except TimeoutError:
+                            break
+                        if event.get("kind") == events.RESET:
+                            break  # dropped events; reload the heap now
+                        self.note(event)
+                        deadline = min(deadline, loop.time() + self.next_wake())
+                except Exception:
+                    logger.exception("Error during lock reaping")
+                    await asyncio.sleep(REAPER_MAX_SLEEP_SECONDS)
+
+
+async def _cleanup_events(session_factory) -> None:
+    count = await delete_in_chunks(session_factory, events.cleanup_expired_events)
+    if count:
+        logger.info("Cleaned up %d expired events", count)
+
+
+async def _configure_storage(session_factory) -> None:
+    async with session_factory() as session:
+        await configure_lock_storage(session)
+        await session.commit()
+
+
+maintenance.register_startup_job("lock_storage", _configure_storage)
+maintenance.register_job("lock_reaper", lambda session_factory: LockReaper(session_factory).run())
+maintenance.register_periodic_job("event_cleanup", CLEANUP_INTERVAL_SECONDS, _cleanup_events)
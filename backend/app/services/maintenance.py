@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+# Session-level advisory lock held by the maintenance leader ("chorus" + 1)
+MAINTENANCE_LOCK_KEY = 0x63686F7275730001
+
+# How often a follower retries the lock, and a crashed job is restarted
+LEADER_RETRY_SECONDS = 5
+# How often the leader checks its connection, and so still holds the lock
+LEADER_CHECK_SECONDS = 5
+
+Job = Callable[[object], Awaitable[None]]
+
+_jobs: dict[str, Job] = {}
+
+
+def register_job(name: str, job: Job) -> None:
+    """Run job(session_factory) on the leader for as long as it leads.
+
+    The job is expected to loop forever; it is cancelled when leadership is
+    lost and restarted if it returns or raises.
+    """
+    _jobs[name] = job
+
+
+def register_startup_job(name: str, job: Job) -> None:
+    """Run job(session_factory) once each time a process becomes leader.
+
+    Meant for one-off setup that must not race between workers. A run that
+    raises is retried after LEADER_RETRY_SECONDS.
+    """
+
+    async def once(session_factory) -> None:
+        await job(session_factory)
+        # Done for this term; park until leadership ends
+        await asyncio.get_running_loop().create_future()
+
+    _jobs[name] = once
+
+
+def register_periodic_job(
+    name: str, interval_seconds: float, job: Job, run_at_start: bool = False
+) -> None:
+    """Run job(session_factory) on the leader every interval_seconds.
+
+    With run_at_start, the first run happens as soon as a process becomes
+    leader rather than one interval later.
+    """
+
+    async def loop(session_factory) -> None:
+        if not run_at_start:
+            await asyncio.sleep(interval_seconds)
+        while True:
+            try:
+                await job(session_factory)
+            except Exception:
+                logger.exception("Error in maintenance job %s", name)
+            await asyncio.sleep(interval_seconds)
+
+    _jobs[name] = loop
+
+
+class LeaderElection:
+    """Runs the registered jobs in exactly one process of the cluster.
+
+    Every worker keeps a connection trying pg_try_advisory_lock; the one
+    that gets it leads until its connection goes away, at which point
+    Postgres releases the lock and a follower takes over within
+    LEADER_RETRY_SECONDS. A leader that loses its connection notices within
+    LEADER_CHECK_SECONDS and stops its jobs, so two leaders may briefly
+    overlap; jobs must tolerate that, as the SKIP LOCKED deletes do.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        session_factory,
+        jobs: dict[str, Job] | None = None,
+        key: int = MAINTENANCE_LOCK_KEY,
+    ) -> None:
+        self.dsn = dsn
+        self.session_factory = session_factory
+        self.jobs = _jobs if jobs is None else jobs
+        self.key = key
+        self.is_leader = False
+
+    async def _supervise(self, name: str, job: Job) -> None:
+        while True:
+            try:
+                await job(self.session_factory)
+                logger.warning("Maintenance job %s exited, restarting", name)
+            except Exception:
+                logger.exception("Maintenance job %s failed, restarting", name)
+            await asyncio.sleep(LEADER_RETRY_SECONDS)
+
+    async def _lead(self, connection: asyncpg.Connection) -> None:
+        tasks = [
+            asyncio.create_task(self._supervise(name, job))
+            for name, job in self.jobs.items()
+        ]
+        try:
+            while True:
+                await asyncio.sleep(LEADER_CHECK_SECONDS)
+                await asyncio.wait_for(
+                    connection.fetchval("SELECT 1"), LEADER_CHECK_SECONDS
+                )
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                while not await connection.fetchval(
+                    "SELECT pg_try_advisory_lock($1)", self.key
+                ):
+                    await asyncio.sleep(LEADER_RETRY_SECONDS)
+                self.is_leader = True
+                logger.info("Elected maintenance leader")
+                await self._lead(connection)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Lost maintenance leadership")
+            finally:
+                self.is_leader = False
+                if connection is not None:
+                    # Closing the session releases the advisory lock
+                    connection.terminate()
+            await asyncio.sleep(LEADER_RETRY_SECONDS)
+
+
+def start_maintenance(database_url: str, session_factory):
+    dsn = make_url(database_url).set(drivername="postgresql")
+    election = LeaderElection(dsn.render_as_string(hide_password=False), session_factory)
+    return asyncio.create_task(election.run())
@@ -0,0 +1,22 @@
+import base64
+import json
+from typing import Any
+
+from app.exceptions import ChorusError
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Encode a keyset tuple as an opaque, URL-safe cursor string."""
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise ChorusError(400, "VALIDATION_ERROR", "Invalid cursor")
+    if not isinstance(values, list):
+        raise ChorusError(400, "VALIDATION_ERROR", "Invalid cursor")
+    return values
@@ -3,17 +3,18 @@ from datetime import datetime, timezone
 
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.exceptions import ChorusError
 from app.models.base import Status
 from app.models.project import Project
 from app.models.task import Task
 from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.services import events
 
 
 async def create_project(session: AsyncSession, data: ProjectCreate) -> Project:
-    project = Project(**data.model_dump())
+    project = Project(**data.model_dump(mode="json"))
     session.add(project)
     await session.flush()
     await session.refresh(project)
@@ -36,9 +37,12 @@ async def update_project(
     session: AsyncSession, project_id: uuid.UUID, data: ProjectUpdate
 ) -> Project:
     project = await get_project(session, project_id)
-    for field, value in data.model_dump(exclude_unset=True).items():
+    changes = data.model_dump(mode="json", exclude_unset=True)
+    for field, value in changes.items():
         setattr(project, field, value)
     await session.flush()
+    if changes.keys() & {"scheduling_weight", "concurrency_caps"}:
+        await events.publish_project_changed(session, project_id)
     await session.refresh(project)
     return project
 
@@ -47,6 +51,7 @@ async def delete_project(session: AsyncSession, project_id: uuid.UUID) -> None:
     project = await get_project(session, project_id)
     await session.delete(project)
     await session.flush()
+    await events.publish_project_changed(session, project_id)
 
 
 async def get_project_detail(session: AsyncSession, project_id: uuid.UUID) -> dict:
@@ -82,7 +87,7 @@ async def get_project_tasks(
     result = await session.execute(
         select(Task)
         .where(Task.project_id == project_id, Task.parent_task_id.is_(None))
-        .options(selectinload(Task.children, recursion_depth=-1), selectinload(Task.lock))
+        .options(joinedload(Task.lock))
         .order_by(Task.position)
     )
     return list(result.scalars().all())
@@ -0,0 +1,236 @@
+import uuid
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.base import LockPurpose, TaskType
+from app.models.lock import TaskLock
+from app.models.project import Project
+from app.models.task import Task
+from app.services import discovery_service
+from app.services.task_service import _load_options
+
+# Points a weight-1 project earns per turn. Task cost is its effective_points
+# (1 when unsized), so shares are fair in points rather than task counts; a
+# small quantum interleaves projects finely instead of serving bursts.
+DRR_QUANTUM = 1
+
+
+@dataclass
+class ProjectQueue:
+    weight: int
+    cap: int | None
+    task_ids: list[uuid.UUID] = field(default_factory=list)
+    costs: list[int] = field(default_factory=list)
+
+
+@dataclass
+class DrrState:
+    ring: list[uuid.UUID]
+    deficits: dict[uuid.UUID, int]
+    # Whether ring[0] already received its quantum for the current turn
+    started: bool
+
+
+class DeficitRoundRobin:
+    """Deficit round robin over project queues.
+
+    Each turn a project's deficit grows by quantum * weight, and it is served
+    while its head task costs no more than the deficit. The state lives in
+    process; plan() works on a copy so reads can preview the order, and
+    apply() commits it once a pick is actually taken.
+    """
+
+    def __init__(self, quantum: int = DRR_QUANTUM) -> None:
+        self.quantum = quantum
+        self.state = DrrState(ring=[], deficits={}, started=False)
+
+    def plan(
+        self, queues: dict[uuid.UUID, ProjectQueue], n: int
+    ) -> tuple[list[tuple[uuid.UUID, int]], DrrState]:
+        """Next n picks as (project_id, index into its queue), and the state after them."""
+        known = [p for p in self.state.ring if p in queues]
+        ring = known + sorted((p for p in queues if p not in known), key=str)
+        started = self.state.started and bool(known) and known[0] == self.state.ring[0]
+        deficits = {p: self.state.deficits.get(p, 0) for p in ring}
+        served = dict.fromkeys(ring, 0)
+
+        picks: list[tuple[uuid.UUID, int]] = []
+        idle_turns = 0
+        while ring and len(picks) < n:
+            project_id = ring[0]
+            queue = queues[project_id]
+            if served[project_id] >= len(queue.costs):
+                # Drained; idle queues don't bank deficit
+                ring.pop(0)
+                deficits.pop(project_id)
+                started = False
+                idle_turns = 0
+                continue
+            if idle_turns == len(ring):
+                # A whole round served nobody: skip ahead the rounds that
+                # would pass before the nearest head becomes affordable.
+                skip = min(
+                    -(-(queues[p].costs[served[p]] - deficits[p]) // (self.quantum * queues[p].weight))
+                    for p in ring
+                ) - 1
+                for p in ring:
+                    deficits[p] += skip * self.quantum * queues[p].weight
+                idle_turns = 0
+            if not started:
+                deficits[project_id] += self.quantum * queue.weight
+                started = True
+            cost = queue.costs[served[project_id]]
+            if deficits[project_id] >= cost:
+                deficits[project_id] -= cost
+                picks.append((project_id, served[project_id]))
+                served[project_id] += 1
+                idle_turns = 0
+            else:
+                ring.append(ring.pop(0))
+                started = False
+                idle_turns += 1
+        return picks, DrrState(ring=ring, deficits=deficits, started=started)
+
+    def apply(self, state: DrrState) -> None:
+        self.state = state
+
+
+_schedulers: dict[str, DeficitRoundRobin] = {}
+
+
+def get_scheduler(operation: str) -> DeficitRoundRobin:
+    return _schedulers.setdefault(operation, DeficitRoundRobin())
+
+
+def task_cost(effective_points: int | None) -> int:
+    return max(effective_points or 1, 1)
+
+
+async def active_lock_counts(
+    session: AsyncSession, purpose: LockPurpose, project_id: uuid.UUID | None = None
+) -> dict[uuid.UUID, int]:
+    """Unexpired locks per project for a purpose."""
+    stmt = (
+        select(Task.project_id, func.count())
+        .select_from(TaskLock)
+        .join(Task, Task.id == TaskLock.task_id)
+        .where(TaskLock.expires_at > func.now(), TaskLock.lock_purpose == purpose)
+        .group_by(Task.project_id)
+    )
+    if project_id:
+        stmt = stmt.where(Task.project_id == project_id)
+    result = await session.execute(stmt)
+    return dict(result.all())
+
+
+async def load_queues(
+    session: AsyncSession,
+    operation: str,
+    project_id: uuid.UUID | None = None,
+    task_type: TaskType | None = None,
+    min_points: int | None = None,
+    max_points: int | None = None,
+    depth: int = 1,
+    exclude: set[uuid.UUID] | frozenset = frozenset(),
+) -> dict[uuid.UUID, ProjectQueue]:
+    """The first `depth` eligible tasks of every project with spare capacity.
+
+    One LATERAL query walks each project's partial queue index; projects at
+    their cap for the operation are left out, and the rest are trimmed to
+    the locks they may still take.
+    """
+    filters = discovery_service.available_filters(
+        operation, None, task_type, min_points, max_points
+    )
+    if filters is None:
+        return {}
+
+    projects = select(
+        Project.id, Project.scheduling_weight, Project.concurrency_caps
+    )
+    if project_id:
+        projects = projects.where(Project.id == project_id)
+    if exclude:
+        projects = projects.where(Project.id.not_in(exclude))
+    projects = projects.subquery()
+    heads = (
+        select(Task.id, Task.effective_points)
+        .where(Task.project_id == projects.c.id, *filters)
+        .order_by(*discovery_service._sort_order())
+        .limit(depth)
+        .lateral()
+    )
+    result = await session.execute(
+        select(
+            projects.c.id,
+            projects.c.scheduling_weight,
+            projects.c.concurrency_caps,
+            heads.c.id,
+            heads.c.effective_points,
+        )
+        .select_from(projects)
+        .join(heads, true())
+    )
+
+    queues: dict[uuid.UUID, ProjectQueue] = {}
+    for pid, weight, caps, task_id, effective_points in result.all():
+        queue = queues.get(pid)
+        if queue is None:
+            queue = queues[pid] = ProjectQueue(weight, (caps or {}).get(operation))
+        queue.task_ids.append(task_id)
+        queue.costs.append(task_cost(effective_points))
+
+    capped = [pid for pid, q in queues.items() if q.cap is not None]
+    if capped:
+        active = await active_lock_counts(session, LockPurpose(operation), project_id)
+        for pid in capped:
+            queue = queues[pid]
+            room = max(queue.cap - active.get(pid, 0), 0)
+            del queue.task_ids[room:], queue.costs[room:]
+            if not room:
+                del queues[pid]
+    return queues
+
+
+async def get_fair_available(
+    session: AsyncSession,
+    operation: str,
+    project_id: uuid.UUID | None = None,
+    task_type: TaskType | None = None,
+    min_points: int | None = None,
+    max_points: int | None = None,
+    limit: int = 50,
+) -> list[Task]:
+    """Preview the next `limit` fair-share picks without advancing the scheduler."""
+    queues = await load_queues(
+        session, operation, project_id, task_type, min_points, max_points, depth=limit
+    )
+    picks, _ = get_scheduler(operation).plan(queues, limit)
+    ids = [queues[pid].task_ids[i] for pid, i in picks]
+    if not ids:
+        return []
+    result = await session.execute(
+        select(Task).where(Task.id.in_(ids)).options(*_load_options("lock"))
+    )
+    by_id = {t.id: t for t in result.scalars().all()}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+async def under_cap(
+    session: AsyncSession, project_id: uuid.UUID, operation: str
+) -> bool:
+    """Recheck a project's cap before claiming from it.
+
+    Capped projects have their row locked FOR NO KEY UPDATE (which doesn't
+    block task inserts) until the claim commits, so concurrent claimers
+    can't both take the last slot. Uncapped projects aren't serialised.
+    """
+    stmt = select(Project.concurrency_caps).where(Project.id == project_id)
+    cap = ((await session.execute(stmt)).scalar() or {}).get(operation)
+    if cap is None:
+        return True
+    await session.execute(stmt.with_for_update(key_share=True))
+    active = await active_lock_counts(session, LockPurpose(operation), project_id)
+    return active.get(project_id, 0) < cap
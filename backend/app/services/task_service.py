@@ -1,68 +1,164 @@
 import uuid
 from datetime import datetime, timezone
+from typing import Literal
 
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, insert, literal, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, joinedload, selectinload
 
 from app.exceptions import ChorusError
 from app.models.base import Status
+from app.models.closure import TaskClosure
 from app.models.task import Task
 from app.schemas.task import TaskCreate, TaskUpdate
+from app.services import events
+from app.services.pagination import decode_cursor, encode_cursor
 
 
-def compute_rolled_up_points(task: Task) -> int | None:
-    """Sum of effective_points of all children. None if no children or none are sized."""
-    if not task.children:
-        return None
-    total = 0
-    any_sized = False
-    for child in task.children:
-        ep = compute_effective_points(child)
-        if ep is not None:
-            total += ep
-            any_sized = True
-    return total if any_sized else None
-
-
-def compute_effective_points(task: Task) -> int | None:
-    """Rolled-up points if available, else own points."""
-    rup = compute_rolled_up_points(task)
-    if rup is not None:
-        return rup
-    return task.points
-
-
-def compute_unsized_children(task: Task) -> int:
-    """Count of direct children where points is None."""
-    return sum(1 for child in task.children if child.points is None)
-
-
-def compute_readiness(task: Task) -> str:
+def compute_readiness(
+    needs_refinement: bool,
+    points: int | None,
+    effective_points: int | None,
+    children_count: int,
+    unsized_children: int,
+) -> str:
     """Compute readiness state per architecture doc rules."""
-    if task.needs_refinement:
+    if needs_refinement:
         return "needs_refinement"
-    if task.points is None and not task.children:
+    if points is None and not children_count:
         return "needs_sizing"
-    ep = compute_effective_points(task)
-    if task.children and compute_unsized_children(task) > 0:
+    if children_count and unsized_children > 0:
         return "needs_breakdown"
-    if ep is not None and ep > 6:
+    if effective_points is not None and effective_points > 6:
         return "needs_breakdown"
-    if task.children:
+    if children_count:
         return "blocked_by_children"
     return "ready"
 
 
-def is_locked(task: Task) -> bool:
+async def refresh_rollups(session: AsyncSession, task_id: uuid.UUID) -> None:
+    """Recompute stored rollup columns for a task and propagate up its ancestors.
+
+    Each level only aggregates its direct children's stored columns. The walk
+    stops once an ancestor's effective_points is unchanged, since nothing above
+    it can change either. The starting task's parent is always refreshed
+    because its unsized_children depends on the starting task's own points.
+    Rows are locked bottom-up, the same order for every writer.
+    """
+    child = aliased(Task)
+    current_id = task_id
+    while current_id is not None:
+        # Lock the row before aggregating, in its own statement: under READ
+        # COMMITTED the aggregate then gets a snapshot taken after any
+        # concurrent writer under the same parent has committed, instead of
+        # overwriting its rollup with stale sums.
+        await session.execute(
+            select(Task.id).where(Task.id == current_id).with_for_update()
+        )
+        result = await session.execute(
+            select(
+                Task.parent_task_id,
+                Task.points,
+                Task.needs_refinement,
+                Task.effective_points,
+                Task.rolled_up_points,
+                Task.unsized_children,
+                Task.children_count,
+                Task.readiness,
+                select(func.count(child.id))
+                .where(child.parent_task_id == Task.id)
+                .scalar_subquery()
+                .label("new_children_count"),
+                select(func.count(child.id))
+                .where(child.parent_task_id == Task.id, child.points.is_(None))
+                .scalar_subquery()
+                .label("new_unsized_children"),
+                select(func.sum(child.effective_points))
+                .where(child.parent_task_id == Task.id)
+                .scalar_subquery()
+                .label("new_rolled_up_points"),
+            ).where(Task.id == current_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return
+        children_count = row.new_children_count
+        unsized_children = row.new_unsized_children
+        rolled_up_points = row.new_rolled_up_points
+        effective_points = rolled_up_points if rolled_up_points is not None else row.points
+        readiness = compute_readiness(
+            row.needs_refinement,
+            row.points,
+            effective_points,
+            children_count,
+            unsized_children,
+        )
+        values = {
+            "effective_points": effective_points,
+            "rolled_up_points": rolled_up_points,
+            "unsized_children": unsized_children,
+            "children_count": children_count,
+            "readiness": readiness,
+        }
+        stored = {
+            "effective_points": row.effective_points,
+            "rolled_up_points": row.rolled_up_points,
+            "unsized_children": row.unsized_children,
+            "children_count": row.children_count,
+            "readiness": row.readiness,
+        }
+        if values != stored:
+            # Keep updated_at untouched: rollups are derived, not user edits,
+            # and context freshness compares against ancestors' updated_at.
+            await session.execute(
+                update(Task)
+                .where(Task.id == current_id)
+                .values(**values, updated_at=Task.updated_at)
+            )
+        if current_id != task_id and effective_points == row.effective_points:
+            return
+        current_id = row.parent_task_id
+
+
+async def index_hierarchy(
+    session: AsyncSession,
+    parent_task_id: uuid.UUID | None,
+    task_ids: list[uuid.UUID],
+) -> None:
+    """Add task_closure rows for newly created tasks under parent_task_id."""
+    rows = [{"ancestor_id": t, "descendant_id": t, "depth": 0} for t in task_ids]
+    if parent_task_id:
+        result = await session.execute(
+            select(TaskClosure.ancestor_id, TaskClosure.depth).where(
+                TaskClosure.descendant_id == parent_task_id
+            )
+        )
+        for ancestor_id, depth in result.all():
+            rows.extend(
+                {"ancestor_id": ancestor_id, "descendant_id": t, "depth": depth + 1}
+                for t in task_ids
+            )
+    await session.execute(insert(TaskClosure), rows)
+
+
+def _subtree_ids(task_id: uuid.UUID, min_depth: int = 0):
+    return select(TaskClosure.descendant_id).where(
+        TaskClosure.ancestor_id == task_id, TaskClosure.depth >= min_depth
+    )
+
+
+def is_locked(task: Task, now: datetime | None = None) -> bool:
     """Check if task has an active (non-expired) lock."""
     if task.lock is None:
         return False
-    return task.lock.expires_at > datetime.now(timezone.utc)
+    return task.lock.expires_at > (now or datetime.now(timezone.utc))
+
 
+def enrich_task(task: Task, now: datetime | None = None) -> dict:
+    """Build a dict with stored + computed fields for a task.
 
-def enrich_task(task: Task) -> dict:
-    """Build a dict with stored + computed fields for a task."""
+    Rollups are read from stored columns, so only task.lock must be loaded.
+    """
     return {
         "id": task.id,
         "project_id": task.project_id,
@@ -76,20 +172,59 @@ def enrich_task(task: Task) -> dict:
         "position": task.position,
         "created_at": task.created_at,
         "updated_at": task.updated_at,
-        "effective_points": compute_effective_points(task),
-        "rolled_up_points": compute_rolled_up_points(task),
-        "unsized_children": compute_unsized_children(task),
-        "readiness": compute_readiness(task),
-        "children_count": len(task.children) if task.children else 0,
-        "is_locked": is_locked(task),
+        "effective_points": task.effective_points,
+        "rolled_up_points": task.rolled_up_points,
+        "unsized_children": task.unsized_children,
+        "readiness": task.readiness,
+        "children_count": task.children_count,
+        "is_locked": is_locked(task, now),
     }
 
 
-def _task_load_options():
-    return [
-        selectinload(Task.children, recursion_depth=-1),
-        selectinload(Task.lock),
-    ]
+def enrich_tasks(tasks: list[Task]) -> list[dict]:
+    """Enrich a flat list of tasks in a single pass, without walking children."""
+    now = datetime.now(timezone.utc)
+    return [enrich_task(t, now) for t in tasks]
+
+
+def build_forest(nodes: list[dict]) -> list[dict]:
+    """Link enriched rows into trees in one iterative pass.
+
+    Rows must arrive with siblings already in position order (e.g. ordered by
+    depth, parent, position); children are appended as they are seen. Returns
+    the roots, i.e. nodes whose parent is not in ``nodes``.
+    """
+    by_id = {}
+    roots = []
+    for node in nodes:
+        node["children"] = []
+        by_id[node["id"]] = node
+    for node in nodes:
+        parent = by_id.get(node["parent_task_id"])
+        if parent is None:
+            roots.append(node)
+        else:
+            parent["children"].append(node)
+    return roots
+
+
+# Loader profiles, cheapest first. Rollups are stored columns, so "row"
+# already covers row+rollups; "lock" is what enrich_task needs. Trees are
+# fetched through the closure table, never as a loaded object graph.
+LoadProfile = Literal["row", "lock"]
+
+
+def _load_options(profile: LoadProfile) -> list:
+    if profile == "row":
+        return []
+    return [joinedload(Task.lock)]
+
+
+async def ensure_task_exists(session: AsyncSession, task_id: uuid.UUID) -> None:
+    """Existence-only check: a SELECT 1 without loading the row."""
+    result = await session.execute(select(literal(1)).where(Task.id == task_id))
+    if result.scalar_one_or_none() is None:
+        raise ChorusError(404, "NOT_FOUND", "Task not found")
 
 
 async def create_task(
@@ -131,17 +266,25 @@ async def create_task(
     )
     session.add(task)
     await session.flush()
+    await index_hierarchy(session, parent_task_id, [task.id])
+    await refresh_rollups(session, task.id)
+    await events.publish(session, events.TASK_CREATED, [task.id])
 
     # Reload with relationships
     result = await session.execute(
-        select(Task).where(Task.id == task.id).options(*_task_load_options())
+        select(Task)
+        .where(Task.id == task.id)
+        .options(*_load_options("lock"))
+        .execution_options(populate_existing=True)
     )
     return result.scalar_one()
 
 
-async def get_task(session: AsyncSession, task_id: uuid.UUID) -> Task:
+async def get_task(
+    session: AsyncSession, task_id: uuid.UUID, profile: LoadProfile = "lock"
+) -> Task:
     result = await session.execute(
-        select(Task).where(Task.id == task_id).options(*_task_load_options())
+        select(Task).where(Task.id == task_id).options(*_load_options(profile))
     )
     task = result.scalar_one_or_none()
     if not task:
@@ -152,77 +295,144 @@ async def get_task(session: AsyncSession, task_id: uuid.UUID) -> Task:
 async def update_task(
     session: AsyncSession, task_id: uuid.UUID, data: TaskUpdate
 ) -> Task:
-    task = await get_task(session, task_id)
+    task = await get_task(session, task_id, "row")
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(task, field, value)
     await session.flush()
+    await events.publish(session, events.TASK_UPDATED, [task.id])
 
     # Reload with relationships
     result = await session.execute(
-        select(Task).where(Task.id == task.id).options(*_task_load_options())
+        select(Task).where(Task.id == task.id).options(*_load_options("lock"))
     )
     return result.scalar_one()
 
 
 async def delete_task(session: AsyncSession, task_id: uuid.UUID) -> None:
-    task = await get_task(session, task_id)
-    await session.delete(task)
-    await session.flush()
+    result = await session.execute(
+        select(Task.parent_task_id).where(Task.id == task_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise ChorusError(404, "NOT_FOUND", "Task not found")
+    parent_task_id = row.parent_task_id
 
+    # Announce before deleting: publish reads the project from the rows.
+    # The subtree stays a subquery; it can exceed asyncpg's bind limit.
+    await events.publish(session, events.TASK_DELETED, _subtree_ids(task_id))
 
-async def get_task_tree(session: AsyncSession, task_id: uuid.UUID) -> dict:
-    """Fetch full recursive subtree using a recursive CTE."""
-    # Verify root exists
-    await get_task(session, task_id)
+    # One statement for the whole subtree; closure rows cascade with it
+    await session.execute(delete(Task).where(Task.id.in_(_subtree_ids(task_id))))
+    if parent_task_id:
+        await refresh_rollups(session, parent_task_id)
 
-    # Use recursive CTE to get all descendants
-    cte = (
-        select(Task.id, Task.parent_task_id)
-        .where(Task.id == task_id)
-        .cte(name="subtree", recursive=True)
-    )
-    cte = cte.union_all(
-        select(Task.id, Task.parent_task_id).join(cte, Task.parent_task_id == cte.c.id)
-    )
-    result = await session.execute(select(cte.c.id))
-    all_ids = [row[0] for row in result.all()]
 
-    # Load all tasks with their children and locks
-    result = await session.execute(
+def _set_expand_cursors(nodes: list[dict]) -> None:
+    """Give every node whose children were not all returned an expand cursor.
+
+    The cursor is the (position, id) keyset of the last child returned, or an
+    empty keyset when none were, and feeds get_task_children.
+    """
+    for node in nodes:
+        children = node.get("children", [])
+        if node["children_count"] > len(children):
+            last = children[-1] if children else None
+            node["expand_cursor"] = encode_cursor(
+                [last["position"], last["id"]] if last else []
+            )
+        else:
+            node["expand_cursor"] = None
+
+
+async def get_task_tree(
+    session: AsyncSession,
+    task_id: uuid.UUID,
+    max_depth: int | None = None,
+    max_nodes: int | None = None,
+) -> dict:
+    """Fetch the subtree, with locks, in one query over task_closure.
+
+    Rows come back breadth-first, so max_nodes keeps the top levels. Nodes
+    cut off by max_depth or max_nodes carry an expand_cursor.
+    """
+    stmt = (
         select(Task)
-        .where(Task.id.in_(all_ids))
-        .options(selectinload(Task.children), selectinload(Task.lock))
+        .join(TaskClosure, TaskClosure.descendant_id == Task.id)
+        .where(TaskClosure.ancestor_id == task_id)
+        .options(*_load_options("lock"))
+        .order_by(TaskClosure.depth, Task.parent_task_id, Task.position, Task.id)
     )
-    tasks_by_id = {t.id: t for t in result.scalars().all()}
-
-    def build_tree(tid: uuid.UUID) -> dict:
-        t = tasks_by_id[tid]
-        node = enrich_task(t)
-        node["children"] = sorted(
-            [build_tree(c.id) for c in t.children if c.id in tasks_by_id],
-            key=lambda x: x["position"],
-        )
-        return node
+    if max_depth is not None:
+        stmt = stmt.where(TaskClosure.depth <= max_depth)
+    if max_nodes is not None:
+        stmt = stmt.limit(max_nodes)
+    result = await session.execute(stmt)
+    tasks = list(result.scalars().all())
+    if not tasks:
+        raise ChorusError(404, "NOT_FOUND", "Task not found")
 
-    return build_tree(task_id)
+    nodes = enrich_tasks(tasks)
+    # The root is the only depth-0 row, so it comes first
+    root = build_forest(nodes)[0]
+    _set_expand_cursors(nodes)
+    return root
+
+
+async def get_task_children(
+    session: AsyncSession,
+    task_id: uuid.UUID,
+    cursor: str | None = None,
+    limit: int = 50,
+) -> dict:
+    """Fetch the next page of a task's direct children, one level deep."""
+    await ensure_task_exists(session, task_id)
+
+    stmt = (
+        select(Task)
+        .where(Task.parent_task_id == task_id)
+        .options(*_load_options("lock"))
+        .order_by(Task.position, Task.id)
+        .limit(limit + 1)
+    )
+    after = decode_cursor(cursor) if cursor else []
+    if after:
+        try:
+            position, child_id = int(after[0]), uuid.UUID(after[1])
+        except (AttributeError, IndexError, TypeError, ValueError):
+            raise ChorusError(400, "VALIDATION_ERROR", "Invalid cursor")
+        stmt = stmt.where(tuple_(Task.position, Task.id) > (position, child_id))
+    result = await session.execute(stmt)
+    tasks = list(result.scalars().all())
+
+    children = enrich_tasks(tasks[:limit])
+    for child in children:
+        child["children"] = []
+    _set_expand_cursors(children)
+    next_cursor = None
+    if len(tasks) > limit:
+        last = children[-1]
+        next_cursor = encode_cursor([last["position"], last["id"]])
+    return {"children": children, "next_cursor": next_cursor}
+
+
+def _ancestry_query(task_id: uuid.UUID, *columns, min_depth: int = 0):
+    """Ancestors of task_id (itself included at depth 0), ordered root → target."""
+    return (
+        select(*columns)
+        .join(TaskClosure, TaskClosure.ancestor_id == Task.id)
+        .where(TaskClosure.descendant_id == task_id, TaskClosure.depth >= min_depth)
+        .order_by(TaskClosure.depth.desc())
+    )
 
 
 async def get_task_ancestry(session: AsyncSession, task_id: uuid.UUID) -> list[Task]:
-    """Walk parent_task_id chain to root. Returns list ordered root → target."""
-    chain = []
-    current_id = task_id
-    while current_id is not None:
-        result = await session.execute(
-            select(Task).where(Task.id == current_id).options(*_task_load_options())
-        )
-        task = result.scalar_one_or_none()
-        if task is None:
-            if current_id == task_id:
-                raise ChorusError(404, "NOT_FOUND", "Task not found")
-            break
-        chain.append(task)
-        current_id = task.parent_task_id
-    chain.reverse()
+    """Resolve the chain to root in one query. Returns list ordered root → target."""
+    result = await session.execute(
+        _ancestry_query(task_id, Task).options(*_load_options("lock"))
+    )
+    chain = list(result.scalars().all())
+    if not chain:
+        raise ChorusError(404, "NOT_FOUND", "Task not found")
     return chain
 
 
@@ -230,13 +440,12 @@ async def get_task_context(
     session: AsyncSession, task_id: uuid.UUID, include_commits: bool = False
 ) -> dict:
     """Fetch task + ancestry + work log (+ commits). Compute freshness."""
-    # Load task with all relationships needed (deep children for enrich_task)
+    # Load task with all relationships needed
     result = await session.execute(
         select(Task)
         .where(Task.id == task_id)
         .options(
-            selectinload(Task.children, recursion_depth=-1),
-            selectinload(Task.lock),
+            *_load_options("lock"),
             selectinload(Task.work_log_entries),
             selectinload(Task.commits),
         )
@@ -245,16 +454,24 @@ async def get_task_context(
     if not task:
         raise ChorusError(404, "NOT_FOUND", "Task not found")
 
-    # Capture enriched data and related objects before ancestry query
-    # (ancestry reloads same objects and may expire children relationships)
     task_enriched = enrich_task(task)
     work_log_entries = list(task.work_log_entries or [])
     commits_list = list(task.commits or [])
     context_captured_at = task.context_captured_at
 
-    ancestry = await get_task_ancestry(session, task_id)
-    # Last item is the target task itself
-    ancestors = ancestry[:-1] if ancestry else []
+    # Only the columns the response needs, excluding the task itself
+    result = await session.execute(
+        _ancestry_query(
+            task_id,
+            Task.id,
+            Task.name,
+            Task.description,
+            Task.context,
+            Task.updated_at,
+            min_depth=1,
+        )
+    )
+    ancestors = result.all()
     stale_reasons: list[str] = []
     if context_captured_at is None:
         freshness = "stale"
@@ -316,39 +533,27 @@ _VALID_TRANSITIONS: dict[Status, set[Status]] = {
 }
 
 
-def _check_descendants_terminal(task: Task) -> tuple[bool, bool]:
+async def _check_descendants_terminal(
+    session: AsyncSession, task_id: uuid.UUID
+) -> tuple[bool, bool]:
     """Check if all descendants are terminal (done/wont_do) and at least one is done.
-    Returns (all_terminal, any_done). Uses the already-loaded children tree."""
-    terminal = {Status.done, Status.wont_do}
-    all_terminal = True
-    any_done = False
-
-    def walk(t: Task) -> None:
-        nonlocal all_terminal, any_done
-        for child in (t.children or []):
-            s = Status(child.status) if isinstance(child.status, str) else child.status
-            if s not in terminal:
-                all_terminal = False
-            if s == Status.done:
-                any_done = True
-            walk(child)
-
-    walk(task)
-    return all_terminal, any_done
+    Returns (all_terminal, any_done). One aggregate over the closure index."""
+    result = await session.execute(
+        select(
+            func.count(Task.id).filter(Task.status.not_in([Status.done, Status.wont_do])),
+            func.count(Task.id).filter(Task.status == Status.done),
+        ).where(Task.id.in_(_subtree_ids(task_id, min_depth=1)))
+    )
+    non_terminal, done = result.one()
+    return non_terminal == 0, done > 0
 
 
 async def update_task_status(
     session: AsyncSession, task_id: uuid.UUID, new_status: Status
 ) -> Task:
     """Update task status with validation rules."""
-    # Load with deep enough children for descendant checks
     result = await session.execute(
-        select(Task)
-        .where(Task.id == task_id)
-        .options(
-            selectinload(Task.children, recursion_depth=-1),
-            selectinload(Task.lock),
-        )
+        select(Task).where(Task.id == task_id).options(*_load_options("lock"))
     )
     task = result.scalar_one_or_none()
     if not task:
@@ -369,9 +574,8 @@ async def update_task_status(
 
     # To done: all descendants must be terminal, at least one done
     if new_status == Status.done:
-        has_children = bool(task.children)
-        if has_children:
-            all_terminal, any_done = _check_descendants_terminal(task)
+        if task.children_count:
+            all_terminal, any_done = await _check_descendants_terminal(session, task.id)
             if not all_terminal:
                 raise ChorusError(
                     422,
@@ -387,6 +591,9 @@ async def update_task_status(
 
     task.status = new_status
     await session.flush()
+    await events.publish(
+        session, events.TASK_STATUS_CHANGED, [task.id], {"status": new_status.value}
+    )
 
     # If reopening a child (done -> todo/doing), reopen parent if it's done
     if old_status == Status.done and new_status in (Status.todo, Status.doing):
@@ -395,10 +602,16 @@ async def update_task_status(
             if parent and (Status(parent.status) if isinstance(parent.status, str) else parent.status) == Status.done:
                 parent.status = Status.todo
                 await session.flush()
+                await events.publish(
+                    session,
+                    events.TASK_STATUS_CHANGED,
+                    [parent.id],
+                    {"status": Status.todo.value},
+                )
 
     # Reload with relationships
     result = await session.execute(
-        select(Task).where(Task.id == task.id).options(*_task_load_options())
+        select(Task).where(Task.id == task.id).options(*_load_options("lock"))
     )
     return result.scalar_one()
 
@@ -407,11 +620,9 @@ async def reorder_task(
     session: AsyncSession, task_id: uuid.UUID, new_position: int
 ) -> Task:
     """Change a task's position among its siblings."""
-    task = await get_task(session, task_id)
+    task = await get_task(session, task_id, "row")
 
     # Shift siblings at >= new_position up by 1
-    from sqlalchemy import update
-
     await session.execute(
         update(Task)
         .where(
@@ -425,9 +636,10 @@ async def reorder_task(
 
     task.position = new_position
     await session.flush()
+    await events.publish(session, events.TASK_UPDATED, [task.id])
 
     # Reload
     result = await session.execute(
-        select(Task).where(Task.id == task.id).options(*_task_load_options())
+        select(Task).where(Task.id == task.id).options(*_load_options("lock"))
     )
     return result.scalar_one()
@@ -1,5 +1,6 @@
 from collections.abc import AsyncGenerator
 
+import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy import event
@@ -12,6 +13,9 @@ from sqlalchemy.ext.asyncio import (
 from app.db.session import get_session
 from app.main import app
 from app.models import Base
+from app.services.atomic_service import ensure_idempotency_partitions
+from app.services import idempotency_cache
+from app.services.discovery_cache import cache
 
 DATABASE_URL = "postgresql+asyncpg://chorus:chorus_dev@db:5432/chorus_test"
 
@@ -26,6 +30,8 @@ async def engine():
         async with eng.begin() as conn:
             await conn.run_sync(Base.metadata.drop_all)
             await conn.run_sync(Base.metadata.create_all)
+            async with AsyncSession(bind=conn) as s:
+                await ensure_idempotency_partitions(s)
         _schema_created = True
     yield eng
     await eng.dispose()
@@ -51,6 +57,13 @@ async def session(engine) -> AsyncGenerator[AsyncSession]:
         await txn.rollback()
 
 
+@pytest.fixture(autouse=True)
+def reset_caches():
+    # Each test rolls back its writes, which no version bump announces
+    cache.bump(None)
+    idempotency_cache.cache.clear()
+
+
 @pytest_asyncio.fixture
 async def client(session: AsyncSession) -> AsyncGenerator[AsyncClient]:
     async def override_get_session():
@@ -1,4 +1,18 @@
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
 import pytest
+from sqlalchemy import event, text
+
+from app.services.atomic_service import (
+    check_idempotency,
+    drop_expired_idempotency_partitions,
+    ensure_idempotency_partitions,
+    reserve_idempotency_key,
+    store_idempotency,
+)
+from app.services.idempotency_cache import IdempotencyCache
+from conftest import DATABASE_URL
 
 
 @pytest.fixture
@@ -152,6 +166,79 @@ async def test_breakdown_empty_subtasks(client, task):
     assert resp.status_code == 422
 
 
+# --- Stored rollups ---
+
+
+@pytest.mark.asyncio
+async def test_sizing_grandchild_rolls_up_to_ancestors(client, task):
+    await client.post(
+        f"/tasks/{task['id']}/breakdown",
+        json={
+            "subtasks": [{"name": "Child", "task_type": "feature"}],
+            "work_log_content": "Split",
+        },
+    )
+    tree = (await client.get(f"/tasks/{task['id']}/tree")).json()
+    child_id = tree["children"][0]["id"]
+    await client.post(
+        f"/tasks/{child_id}/breakdown",
+        json={
+            "subtasks": [{"name": "Grandchild", "task_type": "feature"}],
+            "work_log_content": "Split again",
+        },
+    )
+    tree = (await client.get(f"/tasks/{child_id}/tree")).json()
+    grandchild_id = tree["children"][0]["id"]
+
+    resp = await client.get(f"/tasks/{task['id']}")
+    assert resp.json()["children_count"] == 1
+    assert resp.json()["unsized_children"] == 1
+    assert resp.json()["effective_points"] is None
+
+    await client.post(f"/tasks/{grandchild_id}/size", json=_sizing_payload())
+
+    resp = await client.get(f"/tasks/{child_id}")
+    data = resp.json()
+    assert data["rolled_up_points"] == 5
+    assert data["readiness"] == "blocked_by_children"
+
+    resp = await client.get(f"/tasks/{task['id']}")
+    data = resp.json()
+    assert data["rolled_up_points"] == 5
+    assert data["effective_points"] == 5
+    # Child itself has no own points, so the root still sees it as unsized
+    assert data["unsized_children"] == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_child_updates_parent_rollups(client, task):
+    await client.post(
+        f"/tasks/{task['id']}/breakdown",
+        json={
+            "subtasks": [
+                {"name": "Keep", "task_type": "feature"},
+                {"name": "Drop", "task_type": "feature"},
+            ],
+            "work_log_content": "Split",
+        },
+    )
+    children = (await client.get(f"/tasks/{task['id']}/tree")).json()["children"]
+    await client.post(f"/tasks/{children[0]['id']}/size", json=_sizing_payload())
+
+    resp = await client.get(f"/tasks/{task['id']}")
+    assert resp.json()["children_count"] == 2
+    assert resp.json()["readiness"] == "needs_breakdown"
+
+    await client.delete(f"/tasks/{children[1]['id']}")
+
+    resp = await client.get(f"/tasks/{task['id']}")
+    data = resp.json()
+    assert data["children_count"] == 1
+    assert data["unsized_children"] == 0
+    assert data["effective_points"] == 5
+    assert data["readiness"] == "blocked_by_children"
+
+
 # --- Refine ---
 
 
@@ -314,6 +401,22 @@ async def test_commit_crud(client, task):
     assert len(resp.json()) == 1
 
 
+@pytest.mark.asyncio
+async def test_work_log_and_commits_missing_task(client):
+    missing = "00000000-0000-0000-0000-000000000000"
+    resp = await client.get(f"/tasks/{missing}/work-log")
+    assert resp.status_code == 404
+
+    resp = await client.get(f"/tasks/{missing}/commits")
+    assert resp.status_code == 404
+
+    resp = await client.post(
+        f"/tasks/{missing}/commits",
+        json={"commit_hash": "abc123", "committed_at": "2026-01-15T10:00:00Z"},
+    )
+    assert resp.status_code == 404
+
+
 # --- Idempotency ---
 
 
@@ -347,3 +450,125 @@ async def test_size_without_idempotency_header(client, task):
     resp = await client.post(f"/tasks/{task['id']}/size", json=payload)
     assert resp.status_code == 200
     assert resp.json()["points"] == 5
+
+
+async def _partitions(session):
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'idempotency_records'::regclass ORDER BY 1"
+        )
+    )
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_idempotency_partitions_roll_forward(session):
+    later = datetime(2031, 3, 1, 12, tzinfo=timezone.utc)
+    created = await ensure_idempotency_partitions(session, later)
+    assert created == [
+        "idempotency_records_p20310301",
+        "idempotency_records_p20310302",
+        "idempotency_records_p20310303",
+        "idempotency_records_p20310304",
+    ]
+    assert await ensure_idempotency_partitions(session, later) == []
+
+    # Two days on, every partition before that day has fully expired
+    dropped = await drop_expired_idempotency_partitions(session, later + timedelta(days=2))
+    assert "idempotency_records_p20310301" in dropped
+    assert "idempotency_records_p20310302" in dropped
+    remaining = await _partitions(session)
+    assert remaining == ["idempotency_records_p20310303", "idempotency_records_p20310304"]
+
+
+@pytest.mark.asyncio
+async def test_idempotency_lookup_prunes_partitions(session):
+    await store_idempotency(session, "size:k1", 200, {"ok": True})
+    record = await check_idempotency(session, "size:k1")
+    assert record.response_body == {"ok": True}
+    assert await check_idempotency(session, "size:missing") is None
+
+    now = datetime.now(timezone.utc)
+    plan = await session.execute(
+        text(
+            "EXPLAIN SELECT * FROM idempotency_records WHERE key = 'size:k1' "
+            f"AND expires_at > '{now.isoformat()}' "
+            f"AND expires_at <= '{(now + timedelta(hours=24)).isoformat()}'"
+        )
+    )
+    scanned = {
+        line.split(" on ")[1].split()[0]
+        for line in plan.scalars().all()
+        if " on idempotency_records_p" in line
+    }
+    # Only today's and tomorrow's partitions can hold a live record
+    assert len(scanned) <= 2
+
+
+def test_idempotency_cache_lru_and_expiry():
+    cache = IdempotencyCache(max_entries=2)
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    cache.put("a", 200, {"n": 1}, later)
+    cache.put("b", 200, {"n": 2}, later)
+    assert cache.get("a") == (200, {"n": 1})
+    cache.put("c", 200, {"n": 3}, later)  # evicts b, the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    cache.put("old", 200, {}, datetime.now(timezone.utc) - timedelta(seconds=1))
+    assert cache.get("old") is None
+
+
+@pytest.mark.asyncio
+async def test_idempotent_replay_skips_database(client, task, session):
+    key = "cached-key"
+    payload = _sizing_payload()
+    resp1 = await client.post(
+        f"/tasks/{task['id']}/size", json=payload, headers={"Idempotency-Key": key}
+    )
+    assert resp1.status_code == 200
+
+    statements = []
+    target = session.bind.sync_engine
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", record)
+    try:
+        resp2 = await client.post(
+            f"/tasks/{task['id']}/size", json=payload, headers={"Idempotency-Key": key}
+        )
+    finally:
+        event.remove(target, "before_cursor_execute", record)
+    assert resp2.json() == resp1.json()
+    assert not any("idempotency_records" in s for s in statements)
+
+
+@pytest.mark.asyncio
+async def test_idempotency_cache_ignores_rollback(session):
+    await store_idempotency(session, "size:rolled-back", 200, {"ok": True})
+    await session.rollback()
+    assert await check_idempotency(session, "size:rolled-back") is None
+
+
+@pytest.mark.asyncio
+async def test_reservation_blocks_duplicates(session):
+    key = "size:reserved"
+    assert await reserve_idempotency_key(session, key) is None
+
+    other = await asyncpg.connect(DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://"))
+    try:
+        try_reserve = "SELECT pg_try_advisory_xact_lock(hashtextextended($1, 0))"
+        async with other.transaction():
+            assert await other.fetchval(try_reserve, key) is False
+            assert await other.fetchval(try_reserve, "size:other") is True
+    finally:
+        await other.close()
+
+    await store_idempotency(session, key, 200, {"ok": True})
+    await session.commit()
+
+    record = await reserve_idempotency_key(session, key)
+    assert record.response_body == {"ok": True}
@@ -1,5 +1,15 @@
+import asyncio
+import json
+import time
+
 import pytest
 
+from app.models.task import Task
+from app.services import events
+from app.services import discovery_cache
+from app.services.discovery_cache import DiscoveryCache
+from app.services.pagination import encode_cursor
+
 
 @pytest.fixture
 async def project(client):
@@ -111,6 +121,23 @@ async def test_backlog_pagination(client, project):
     assert len(resp.json()) == 1
 
 
+@pytest.mark.asyncio
+async def test_backlog_pagination_skips_filtered_rows(client, project):
+    pid = project["id"]
+    first = await _create_task(client, pid, "First")
+    await _size_task(client, first["id"])
+    await _create_task(client, pid, "Unsized in between")
+    second = await _create_task(client, pid, "Second")
+    await _size_task(client, second["id"])
+
+    resp = await client.get(f"/projects/{pid}/backlog")
+    full = [d["id"] for d in resp.json()]
+    assert sorted(full) == sorted([first["id"], second["id"]])
+
+    resp = await client.get(f"/projects/{pid}/backlog?limit=1&offset=1")
+    assert [d["id"] for d in resp.json()] == full[1:]
+
+
 # --- /projects/{id}/in-progress ---
 
 
@@ -128,6 +155,45 @@ async def test_in_progress_returns_doing_tasks(client, project):
     assert data[0]["name"] == "In Progress"
 
 
+@pytest.mark.asyncio
+async def test_in_progress_cursor_pagination(client, project):
+    pid = project["id"]
+    for i in range(2):
+        t = await _create_task(client, pid, f"Sized {i}")
+        await _size_task(client, t["id"])
+        await _start_task(client, t["id"])
+        t = await _create_task(client, pid, f"Unsized {i}")
+        await _start_task(client, t["id"])
+
+    resp = await client.get(f"/projects/{pid}/in-progress")
+    full = [d["id"] for d in resp.json()]
+    assert len(full) == 4
+    assert "X-Next-Cursor" not in resp.headers
+
+    walked = []
+    cursor = None
+    while True:
+        params = {"limit": 1, **({"cursor": cursor} if cursor else {})}
+        resp = await client.get(f"/projects/{pid}/in-progress", params=params)
+        assert resp.status_code == 200
+        walked += [d["id"] for d in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert walked == full
+
+
+@pytest.mark.asyncio
+async def test_discovery_invalid_cursor(client, project):
+    resp = await client.get(f"/projects/{project['id']}/backlog?cursor=bogus")
+    assert resp.status_code == 400
+
+    # Well-formed JSON with the wrong types
+    cursor = encode_cursor([1, "2026-01-01T00:00:00+00:00", 5])
+    resp = await client.get(f"/projects/{project['id']}/backlog", params={"cursor": cursor})
+    assert resp.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_in_progress_includes_lock_info(client, project):
     pid = project["id"]
@@ -143,6 +209,22 @@ async def test_in_progress_includes_lock_info(client, project):
     assert data[0]["lock_expires_at"] is not None
 
 
+@pytest.mark.asyncio
+async def test_in_progress_lock_info_follows_heartbeats(client, project):
+    pid = project["id"]
+    t = await _create_task(client, pid, "Locked")
+    await _size_task(client, t["id"])
+    await _start_task(client, t["id"])
+    await _lock_task(client, t["id"])
+    before = (await client.get(f"/projects/{pid}/in-progress")).json()[0]
+
+    # Heartbeats don't invalidate the cached page, but the expiry is current
+    resp = await client.patch(f"/tasks/{t['id']}/lock/heartbeat?caller_label=agent-1")
+    after = (await client.get(f"/projects/{pid}/in-progress")).json()[0]
+    assert after["lock_expires_at"] == resp.json()["expires_at"]
+    assert after["lock_expires_at"] > before["lock_expires_at"]
+
+
 @pytest.mark.asyncio
 async def test_in_progress_no_lock_info_when_unlocked(client, project):
     pid = project["id"]
@@ -314,6 +396,12 @@ async def test_available_filter_by_points(client, project):
     assert all(d["effective_points"] == ep for d in data)
 
 
+@pytest.mark.asyncio
+async def test_available_rejects_unknown_task_type(client):
+    resp = await client.get("/tasks/available?operation=sizing&task_type=epic")
+    assert resp.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_available_requires_operation(client):
     resp = await client.get("/tasks/available")
@@ -331,3 +419,151 @@ async def test_available_pagination(client, project):
 
     resp = await client.get(f"/tasks/available?operation=sizing&project_id={pid}&limit=2&offset=2")
     assert len(resp.json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_available_wait_times_out_empty(client, project):
+    pid = project["id"]
+    start = time.monotonic()
+    resp = await client.get(
+        f"/tasks/available?operation=implementation&project_id={pid}&wait=0.2"
+    )
+    assert resp.status_code == 200
+    assert resp.json() == []
+    assert time.monotonic() - start >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_available_wait_returns_immediately_with_work(client, project):
+    pid = project["id"]
+    await _create_task(client, pid, "Unsized")
+    start = time.monotonic()
+    resp = await client.get(f"/tasks/available?operation=sizing&project_id={pid}&wait=5")
+    assert len(resp.json()) == 1
+    assert time.monotonic() - start < 5
+
+
+@pytest.mark.asyncio
+async def test_available_wait_wakes_on_event(client, project):
+    pid = project["id"]
+    poll = asyncio.create_task(
+        client.get(f"/tasks/available?operation=sizing&project_id={pid}&wait=10")
+    )
+    await asyncio.sleep(0.1)
+    assert not poll.done()
+
+    # The test transaction never commits, so deliver the notification by hand.
+    task = await _create_task(client, pid, "New work")
+    events.listener._dispatch(
+        None,
+        0,
+        events.CHANNEL,
+        json.dumps({"kind": events.TASK_CREATED, "project_id": pid, "task_id": task["id"]}),
+    )
+    resp = await asyncio.wait_for(poll, 5)
+    assert [t["id"] for t in resp.json()] == [task["id"]]
+
+
+@pytest.mark.asyncio
+async def test_available_wait_bounds(client):
+    resp = await client.get("/tasks/available?operation=sizing&wait=-1")
+    assert resp.status_code == 422
+    resp = await client.get("/tasks/available?operation=sizing&wait=3600")
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_available_across_projects(client, project):
+    other = (await client.post("/projects", json={"name": "Other Project"})).json()
+    first = await _create_task(client, project["id"], "First")
+    second = await _create_task(client, other["id"], "Second")
+    third = await _create_task(client, project["id"], "Third")
+
+    resp = await client.get("/tasks/available?operation=sizing&limit=2")
+    page1 = resp.json()
+    resp = await client.get(
+        f"/tasks/available?operation=sizing&limit=2&cursor={resp.headers['X-Next-Cursor']}"
+    )
+    page2 = resp.json()
+    assert sorted(t["id"] for t in page1 + page2) == sorted(
+        [first["id"], second["id"], third["id"]]
+    )
+    assert {t["project_id"] for t in page1 + page2} == {project["id"], other["id"]}
+
+
+@pytest.mark.asyncio
+async def test_discovery_cache_versions():
+    cache = DiscoveryCache(max_entries=2)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return len(loads)
+
+    assert await cache.get_or_load("k", "p1", load) == 1
+    assert await cache.get_or_load("k", "p1", load) == 1
+    assert await cache.get_or_load("k", None, load) == 2
+
+    # A bump invalidates the project and the cross-project entries only
+    await cache.get_or_load("k", "p2", load)
+    cache.bump("p1")
+    assert await cache.get_or_load("k", "p1", load) == 4
+    assert await cache.get_or_load("k", None, load) == 5
+
+    # LRU bound
+    await cache.get_or_load("other", "p1", load)
+    assert len(cache._entries) == 2
+
+
+@pytest.mark.asyncio
+async def test_discovery_cache_ttl():
+    cache = DiscoveryCache(ttl=0)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return len(loads)
+
+    assert await cache.get_or_load("k", "p1", load) == 1
+    assert await cache.get_or_load("k", "p1", load) == 2
+
+
+@pytest.mark.asyncio
+async def test_backlog_cached_until_committed_write(client, session, project):
+    pid = project["id"]
+    resp = await client.get(f"/tasks/available?operation=sizing&project_id={pid}")
+    assert resp.json() == []
+
+    # A write that bypasses the services is not announced, so the page is cached
+    session.add(Task(project_id=pid, name="Silent", task_type="feature", position=0))
+    await session.flush()
+    resp = await client.get(f"/tasks/available?operation=sizing&project_id={pid}")
+    assert resp.json() == []
+
+    task = await _create_task(client, pid, "Announced")
+    resp = await client.get(f"/tasks/available?operation=sizing&project_id={pid}")
+    assert task["id"] in [t["id"] for t in resp.json()]
+    assert len(resp.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_only_discovery_events_bump_cache(client, project):
+    pid = project["id"]
+    task = await _create_task(client, pid)
+    tid = task["id"]
+    version = discovery_cache.cache.version(pid)
+
+    await client.post(
+        f"/tasks/{tid}/lock", json={"caller_label": "agent-1", "lock_purpose": "sizing"}
+    )
+    assert discovery_cache.cache.version(pid) > version
+    version = discovery_cache.cache.version(pid)
+
+    await client.patch(f"/tasks/{tid}/lock/heartbeat?caller_label=agent-1")
+    await client.post(
+        f"/tasks/{tid}/work-log", json={"operation": "sizing", "content": "note"}
+    )
+    assert discovery_cache.cache.version(pid) == version
+
+    await client.delete(f"/tasks/{tid}")
+    assert discovery_cache.cache.version(pid) > version
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import uuid
+
+import asyncpg
+import pytest
+from sqlalchemy import delete, select
+
+from app.models.event import ProjectEvent
+from app.services import events
+from conftest import DATABASE_URL
+
+DSN = DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+
+
+@pytest.fixture
+async def project(client):
+    resp = await client.post("/projects", json={"name": "Events Test Project"})
+    return resp.json()
+
+
+async def _create_task(client, project_id, name="Task"):
+    resp = await client.post(
+        f"/projects/{project_id}/tasks", json={"name": name, "task_type": "feature"}
+    )
+    assert resp.status_code == 201
+    return resp.json()
+
+
+async def _recorded(session, project_id):
+    result = await session.execute(
+        select(ProjectEvent)
+        .where(ProjectEvent.project_id == project_id)
+        .order_by(ProjectEvent.id)
+    )
+    return list(result.scalars().all())
+
+
+async def _next_frame(stream):
+    return await asyncio.wait_for(stream.__anext__(), 2)
+
+
+@pytest.mark.asyncio
+async def test_listener_fans_out_committed_notifications():
+    listener = events.EventListener()
+    with listener.subscribe() as first, listener.subscribe() as second:
+        runner = asyncio.create_task(listener.run(DSN))
+        try:
+            conn = await asyncpg.connect(DSN)
+            try:
+                # Give the listener time to issue LISTEN before notifying.
+                for _ in range(50):
+                    await conn.execute(
+                        "SELECT pg_notify($1, $2)",
+                        events.CHANNEL,
+                        json.dumps({"kind": events.TASK_UPDATED, "project_id": None}),
+                    )
+                    if await events.wait_for(first, lambda e: True, 0.1):
+                        break
+                else:
+                    pytest.fail("listener never received a notification")
+            finally:
+                await conn.close()
+            assert await events.wait_for(
+                second, lambda e: e["kind"] == events.TASK_UPDATED, 1
+            )
+        finally:
+            runner.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await runner
+
+
+@pytest.mark.asyncio
+async def test_wait_for_skips_non_matching_events():
+    listener = events.EventListener()
+    with listener.subscribe() as queue:
+        listener._dispatch(None, 0, events.CHANNEL, json.dumps({"kind": "other"}))
+        listener._dispatch(None, 0, events.CHANNEL, "not json")
+        assert not await events.wait_for(queue, lambda e: e["kind"] == "wanted", 0.05)
+        listener._dispatch(None, 0, events.CHANNEL, json.dumps({"kind": "wanted"}))
+        assert await events.wait_for(queue, lambda e: e["kind"] == "wanted", 0.05)
+
+
+@pytest.mark.asyncio
+async def test_subscribers_filter_by_project_and_reset_on_overflow(monkeypatch):
+    monkeypatch.setattr(events, "SUBSCRIBER_QUEUE_SIZE", 3)
+    listener = events.EventListener()
+    mine, other = str(uuid.uuid4()), str(uuid.uuid4())
+
+    def notify(project_id, n):
+        listener._dispatch(
+            None, 0, events.CHANNEL,
+            json.dumps({"id": n, "kind": events.TASK_UPDATED, "project_id": project_id}),
+        )
+
+    with listener.subscribe(uuid.UUID(mine)) as queue:
+        for n in range(5):
+            notify(other, n)
+        assert queue.empty()
+
+        for n in range(4):
+            notify(mine, n)
+        # The fourth event didn't fit: the backlog is replaced by a reset
+        assert queue.get_nowait() == {"kind": events.RESET, "project_id": mine}
+        assert queue.empty()
+        notify(mine, 4)
+        assert queue.get_nowait()["id"] == 4
+
+
+@pytest.mark.asyncio
+async def test_writes_record_events(client, session, project):
+    pid = project["id"]
+    task = await _create_task(client, pid)
+    tid = task["id"]
+    await client.post(
+        f"/tasks/{tid}/lock", json={"caller_label": "agent-1", "lock_purpose": "sizing"}
+    )
+    await client.patch(f"/tasks/{tid}/lock/heartbeat?caller_label=agent-1")
+    await client.delete(f"/tasks/{tid}/lock?caller_label=agent-1")
+    await client.post(
+        f"/tasks/{tid}/work-log", json={"operation": "implementation", "content": "note"}
+    )
+    await client.patch(f"/tasks/{tid}/status", json={"status": "doing"})
+    await client.delete(f"/tasks/{tid}")
+
+    recorded = await _recorded(session, pid)
+    assert [e.kind for e in recorded] == [
+        events.TASK_CREATED,
+        events.LOCK_ACQUIRED,
+        events.LOCK_RELEASED,
+        events.WORK_LOG_APPENDED,
+        events.TASK_STATUS_CHANGED,
+        events.TASK_DELETED,
+    ]
+    assert all(str(e.task_id) == tid for e in recorded)
+    assert recorded[1].data == {"caller_label": "agent-1", "purpose": "sizing"}
+    assert recorded[4].data == {"status": "doing"}
+
+
+@pytest.mark.asyncio
+async def test_stream_resumes_after_last_event_id(client, session, project):
+    pid = project["id"]
+    first = await _create_task(client, pid, "First")
+    second = await _create_task(client, pid, "Second")
+    created = await _recorded(session, pid)
+
+    stream = events.stream_project_events(session, created[0].project_id, created[0].id)
+    try:
+        # The look-back window replays the resumed-from event too
+        frame = await _next_frame(stream)
+        assert frame.startswith(f"id: {created[0].id}\nevent: task.created\n")
+        frame = await _next_frame(stream)
+        assert frame.startswith(f"id: {created[1].id}\nevent: task.created\n")
+        assert json.loads(frame.split("data: ")[1]) == {"task_id": second["id"]}
+
+        # A live duplicate of a replayed event is dropped; new ones stream.
+        events.listener._dispatch(
+            None, 0, events.CHANNEL,
+            json.dumps({"id": created[1].id, "kind": events.TASK_CREATED,
+                        "project_id": pid, "task_id": second["id"], "data": None}),
+        )
+        events.listener._dispatch(
+            None, 0, events.CHANNEL,
+            json.dumps({"id": created[1].id + 1, "kind": events.TASK_STATUS_CHANGED,
+                        "project_id": pid, "task_id": first["id"],
+                        "data": {"status": "doing"}}),
+        )
+        frame = await _next_frame(stream)
+        assert frame.startswith(f"id: {created[1].id + 1}\nevent: task.status_changed\n")
+        assert json.loads(frame.split("data: ")[1]) == {
+            "task_id": first["id"],
+            "status": "doing",
+        }
+    finally:
+        await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_heartbeats_without_id(client, session, project):
+    pid = project["id"]
+    task = await _create_task(client, pid)
+
+    stream = events.stream_project_events(session, uuid.UUID(pid))
+    try:
+        # Start the generator so it subscribes before anything is dispatched
+        pending = asyncio.ensure_future(_next_frame(stream))
+        while not events.listener._subscribers:
+            await asyncio.sleep(0.01)
+        events.listener._dispatch(
+            None, 0, events.CHANNEL,
+            json.dumps({"kind": events.LOCK_HEARTBEAT, "project_id": pid,
+                        "task_id": task["id"], "data": {"expires_at": "2030-01-01T00:00:00+00:00"}}),
+        )
+        frame = await pending
+        assert frame.startswith(f"event: {events.LOCK_HEARTBEAT}\n")
+        assert json.loads(frame.split("data: ")[1]) == {
+            "task_id": task["id"],
+            "expires_at": "2030-01-01T00:00:00+00:00",
+        }
+    finally:
+        await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_resets_when_events_pruned(client, session, project):
+    pid = project["id"]
+    await _create_task(client, pid)
+    created = await _recorded(session, pid)
+
+    stream = events.stream_project_events(session, created[0].project_id, created[0].id - 10)
+    try:
+        assert await _next_frame(stream) == "event: reset\ndata: {}\n\n"
+    finally:
+        await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_resumes_after_cleanup_emptied_table(client, session, project):
+    pid = project["id"]
+    task = await _create_task(client, pid)
+    created = await _recorded(session, pid)
+    await session.execute(delete(ProjectEvent))
+
+    # Nothing is missing, so there's no reset; the next frame is live
+    stream = events.stream_project_events(session, uuid.UUID(pid), created[-1].id)
+    try:
+        pending = asyncio.ensure_future(_next_frame(stream))
+        while not events.listener._subscribers:
+            await asyncio.sleep(0.01)
+        events.listener._dispatch(
+            None, 0, events.CHANNEL,
+            json.dumps({"id": created[-1].id + 1, "kind": events.TASK_UPDATED,
+                        "project_id": pid, "task_id": task["id"], "data": None}),
+        )
+        assert (await pending).startswith(f"id: {created[-1].id + 1}\n")
+    finally:
+        await stream.aclose()
+
+    # An id that was never issued still resets
+    stream = events.stream_project_events(session, uuid.UUID(pid), created[-1].id + 1000)
+    try:
+        assert await _next_frame(stream) == "event: reset\ndata: {}\n\n"
+    finally:
+        await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_events_endpoint_errors(client, project):
+    resp = await client.get(
+        f"/projects/{project['id']}/events", headers={"Last-Event-ID": "abc"}
+    )
+    assert resp.status_code == 400
+    resp = await client.get("/projects/00000000-0000-0000-0000-000000000000/events")
+    assert resp.status_code == 404
@@ -1,11 +1,24 @@
+import contextlib
 import uuid
 from datetime import datetime, timedelta, timezone
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, text
 
+from app.exceptions import ChorusError
+from app.models.base import LockPurpose
 from app.models.lock import TaskLock
 from app.models.task import Task
+from app.services import events
+from app.services.lock_service import (
+    LockReaper,
+    cleanup_expired_locks,
+    configure_lock_storage,
+    delete_in_chunks,
+    lock_precondition_clause,
+    validate_lock_precondition,
+)
+from app.services.task_service import refresh_rollups
 
 
 @pytest.fixture
@@ -28,6 +41,7 @@ async def make_task(client, session, project_id, points=None):
         task = result.scalar_one()
         task.points = points
         await session.flush()
+        await refresh_rollups(session, task.id)
     return task_data
 
 
@@ -153,6 +167,42 @@ async def test_acquire_implementation_not_ready(client, project, session):
     assert resp.status_code == 422
 
 
+@pytest.mark.asyncio
+async def test_acquire_missing_task(client, project, session):
+    resp = await client.post(
+        f"/tasks/{uuid.uuid4()}/lock",
+        json={"caller_label": "agent-1", "lock_purpose": "refinement"},
+    )
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_precondition_clause_matches_validation(client, project, session):
+    leaf = await make_task(client, session, project["id"])
+    small = await make_task(client, session, project["id"], points=3)
+    large = await make_task(client, session, project["id"], points=8)
+    parent = await make_task(client, session, project["id"], points=2)
+    await client.post(
+        f"/tasks/{parent['id']}/subtasks",
+        json={"name": "Child", "task_type": "feature"},
+    )
+    ids = [uuid.UUID(t["id"]) for t in (leaf, small, large, parent)]
+    tasks = (await session.execute(select(Task).where(Task.id.in_(ids)))).scalars().all()
+
+    for purpose in LockPurpose:
+        result = await session.execute(
+            select(Task.id).where(Task.id.in_(ids), lock_precondition_clause(purpose))
+        )
+        matched = set(result.scalars().all())
+        for task in tasks:
+            try:
+                validate_lock_precondition(task, purpose)
+                allowed = True
+            except ChorusError:
+                allowed = False
+            assert (task.id in matched) == allowed, (purpose, task.points)
+
+
 # --- Heartbeat ---
 
 
@@ -244,3 +294,370 @@ async def test_release_no_lock(client, project, session):
         f"/tasks/{task['id']}/lock?caller_label=agent-1",
     )
     assert resp.status_code == 404
+
+
+# --- Claim ---
+
+
+@pytest.mark.asyncio
+async def test_claim_locks_best_task(client, project, session):
+    small = await make_task(client, session, project["id"], points=2)
+    large = await make_task(client, session, project["id"], points=4)
+
+    resp = await client.post(
+        "/tasks/claim",
+        json={
+            "caller_label": "agent-1",
+            "operation": "implementation",
+            "project_id": project["id"],
+        },
+    )
+    assert resp.status_code == 201
+    data = resp.json()
+    assert data["task"]["id"] == small["id"]
+    assert data["task"]["is_locked"] is True
+    assert data["lock"]["caller_label"] == "agent-1"
+    assert data["lock"]["lock_purpose"] == "implementation"
+
+    resp = await client.post(
+        "/tasks/claim",
+        json={
+            "caller_label": "agent-2",
+            "operation": "implementation",
+            "project_id": project["id"],
+        },
+    )
+    assert resp.status_code == 201
+    assert resp.json()["task"]["id"] == large["id"]
+
+    resp = await client.post(
+        "/tasks/claim",
+        json={
+            "caller_label": "agent-3",
+            "operation": "implementation",
+            "project_id": project["id"],
+        },
+    )
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_claim_takes_over_expired_lock(client, project, session):
+    task = await make_task(client, session, project["id"])
+    await client.post(
+        f"/tasks/{task['id']}/lock",
+        json={"caller_label": "agent-1", "lock_purpose": "sizing"},
+    )
+    result = await session.execute(
+        select(TaskLock).where(TaskLock.task_id == uuid.UUID(task["id"]))
+    )
+    lock = result.scalar_one()
+    lock.expires_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+    await session.flush()
+
+    resp = await client.post(
+        "/tasks/claim",
+        json={
+            "caller_label": "agent-2",
+            "operation": "sizing",
+            "project_id": project["id"],
+        },
+    )
+    assert resp.status_code == 201
+    assert resp.json()["task"]["id"] == task["id"]
+    assert resp.json()["lock"]["caller_label"] == "agent-2"
+
+
+# --- Batch ---
+
+
+@pytest.mark.asyncio
+async def test_batch_acquire_best_effort(client, project, session):
+    free = await make_task(client, session, project["id"])
+    held = await make_task(client, session, project["id"])
+    sized = await make_task(client, session, project["id"], points=3)
+    await client.post(
+        f"/tasks/{held['id']}/lock",
+        json={"caller_label": "other", "lock_purpose": "sizing"},
+    )
+    missing = str(uuid.uuid4())
+
+    resp = await client.post(
+        "/locks/batch",
+        json={
+            "action": "acquire",
+            "items": [
+                {"task_id": t, "caller_label": "agent-1", "lock_purpose": "sizing"}
+                for t in (free["id"], held["id"], sized["id"], missing)
+            ],
+        },
+    )
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["task_id"] for r in results] == [free["id"], held["id"], sized["id"], missing]
+    assert results[0]["ok"] and results[0]["lock"]["caller_label"] == "agent-1"
+    assert [r["error"]["code"] for r in results[1:]] == [
+        "LOCK_CONFLICT",
+        "INVALID_READINESS_STATE",
+        "NOT_FOUND",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_acquire_mixed_purposes(client, project, session):
+    unsized = await make_task(client, session, project["id"])
+    large = await make_task(client, session, project["id"], points=8)
+    stale = await make_task(client, session, project["id"])
+    not_ready = await make_task(client, session, project["id"])
+    await client.post(
+        f"/tasks/{stale['id']}/lock",
+        json={"caller_label": "other", "lock_purpose": "sizing"},
+    )
+    await expire_locks(session, stale["id"])
+
+    requested = [
+        (unsized["id"], "sizing"),
+        (large["id"], "breakdown"),
+        (stale["id"], "sizing"),
+        (not_ready["id"], "implementation"),
+    ]
+    resp = await client.post(
+        "/locks/batch",
+        json={
+            "action": "acquire",
+            "items": [
+                {"task_id": t, "caller_label": "agent-1", "lock_purpose": p}
+                for t, p in requested
+            ],
+        },
+    )
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["ok"] for r in results] == [True, True, True, False]
+    assert [r["lock"]["lock_purpose"] for r in results[:3]] == ["sizing", "breakdown", "sizing"]
+    assert results[2]["lock"]["caller_label"] == "agent-1"
+    assert results[3]["error"]["code"] == "INVALID_READINESS_STATE"
+
+
+@pytest.mark.asyncio
+async def test_batch_acquire_all_or_nothing(client, project, session):
+    free = await make_task(client, session, project["id"])
+    held = await make_task(client, session, project["id"])
+    await client.post(
+        f"/tasks/{held['id']}/lock",
+        json={"caller_label": "other", "lock_purpose": "sizing"},
+    )
+
+    resp = await client.post(
+        "/locks/batch",
+        json={
+            "action": "acquire",
+            "mode": "all_or_nothing",
+            "items": [
+                {"task_id": t, "caller_label": "agent-1", "lock_purpose": "sizing"}
+                for t in (free["id"], held["id"])
+            ],
+        },
+    )
+    assert resp.status_code == 409
+    error = resp.json()["error"]
+    assert error["code"] == "LOCK_CONFLICT"
+    assert error["details"]["failed"] == [
+        {"task_id": held["id"], "code": "LOCK_CONFLICT", "message": "Task is already locked"}
+    ]
+    result = await session.execute(
+        select(TaskLock).where(TaskLock.task_id == uuid.UUID(free["id"]))
+    )
+    assert result.scalar_one_or_none() is None
+
+
+@pytest.mark.asyncio
+async def test_batch_heartbeat(client, project, session):
+    mine = await make_task(client, session, project["id"])
+    theirs = await make_task(client, session, project["id"])
+    unlocked = await make_task(client, session, project["id"])
+    await client.post(
+        f"/tasks/{mine['id']}/lock",
+        json={"caller_label": "agent-1", "lock_purpose": "refinement"},
+    )
+    await client.post(
+        f"/tasks/{theirs['id']}/lock",
+        json={"caller_label": "other", "lock_purpose": "sizing"},
+    )
+
+    resp = await client.post(
+        "/locks/batch",
+        json={
+            "action": "heartbeat",
+            "items": [
+                {"task_id": t, "caller_label": "agent-1"}
+                for t in (mine["id"], theirs["id"], unlocked["id"])
+            ],
+        },
+    )
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert results[0]["ok"]
+    lock = results[0]["lock"]
+    assert lock["last_heartbeat_at"] is not None
+    ttl = datetime.fromisoformat(lock["expires_at"]) - datetime.fromisoformat(
+        lock["last_heartbeat_at"]
+    )
+    assert ttl == timedelta(minutes=30)
+    assert results[1]["error"]["code"] == "VALIDATION_ERROR"
+    assert results[2]["error"]["code"] == "NOT_FOUND"
+
+
+@pytest.mark.asyncio
+async def test_batch_release(client, project, session):
+    mine = await make_task(client, session, project["id"])
+    theirs = await make_task(client, session, project["id"])
+    for task, label in ((mine, "agent-1"), (theirs, "other")):
+        await client.post(
+            f"/tasks/{task['id']}/lock",
+            json={"caller_label": label, "lock_purpose": "sizing"},
+        )
+    items = [{"task_id": t["id"], "caller_label": "agent-1"} for t in (mine, theirs)]
+
+    resp = await client.post("/locks/batch", json={"action": "release", "items": items})
+    assert [r["ok"] for r in resp.json()["results"]] == [True, False]
+    assert resp.json()["results"][1]["error"]["code"] == "VALIDATION_ERROR"
+
+    resp = await client.post(
+        "/locks/batch", json={"action": "release", "force": True, "items": items}
+    )
+    results = resp.json()["results"]
+    assert [r["ok"] for r in results] == [False, True]
+    assert results[0]["error"]["code"] == "NOT_FOUND"
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_invalid_items(client, project, session):
+    task = await make_task(client, session, project["id"])
+    item = {"task_id": task["id"], "caller_label": "agent-1", "lock_purpose": "sizing"}
+    resp = await client.post("/locks/batch", json={"action": "acquire", "items": [item, item]})
+    assert resp.status_code == 422
+
+    resp = await client.post(
+        "/locks/batch",
+        json={"action": "acquire", "items": [{"task_id": task["id"], "caller_label": "a"}]},
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_acquire_precondition_with_expired_lock(client, project, session):
+    task = await make_task(client, session, project["id"], points=8)
+    resp = await client.post(
+        f"/tasks/{task['id']}/lock",
+        json={"caller_label": "agent-1", "lock_purpose": "breakdown"},
+    )
+    assert resp.status_code == 201
+    await expire_locks(session, task["id"])
+
+    # The stale lock doesn't count; the task is already sized
+    resp = await client.post(
+        f"/tasks/{task['id']}/lock",
+        json={"caller_label": "agent-2", "lock_purpose": "sizing"},
+    )
+    assert resp.status_code == 422
+
+
+# --- Expiry ---
+
+
+async def expire_locks(session, *task_ids, ago=timedelta(seconds=1)):
+    result = await session.execute(
+        select(TaskLock).where(TaskLock.task_id.in_([uuid.UUID(t) for t in task_ids]))
+    )
+    for lock in result.scalars().all():
+        lock.expires_at = datetime.now(timezone.utc) - ago
+    await session.flush()
+
+
+@pytest.mark.asyncio
+async def test_cleanup_deletes_in_bounded_chunks(client, project, session):
+    tasks = [await make_task(client, session, project["id"]) for _ in range(3)]
+    for task in tasks:
+        await client.post(
+            f"/tasks/{task['id']}/lock",
+            json={"caller_label": "agent-1", "lock_purpose": "sizing"},
+        )
+    await expire_locks(session, *(t["id"] for t in tasks))
+
+    assert await cleanup_expired_locks(session, limit=2) == 2
+    assert await cleanup_expired_locks(session, limit=2) == 1
+    assert await cleanup_expired_locks(session, limit=2) == 0
+
+    factory = lambda: contextlib.nullcontext(session)  # noqa: E731
+    assert await delete_in_chunks(factory, cleanup_expired_locks, limit=2) == 0
+
+
+@pytest.mark.asyncio
+async def test_reaper_wakes_at_next_expiry(client, project, session):
+    expired = await make_task(client, session, project["id"])
+    live = await make_task(client, session, project["id"])
+    for task in (expired, live):
+        await client.post(
+            f"/tasks/{task['id']}/lock",
+            json={"caller_label": "agent-1", "lock_purpose": "sizing"},
+        )
+    await expire_locks(session, expired["id"])
+
+    reaper = LockReaper(lambda: contextlib.nullcontext(session))
+    assert await reaper.reap() == 1
+    remaining = (await session.execute(select(TaskLock.task_id))).scalars().all()
+    assert uuid.UUID(expired["id"]) not in remaining
+    assert uuid.UUID(live["id"]) in remaining
+
+    # The live sizing lock expires in about 15 minutes, beyond the max sleep
+    assert reaper.next_wake() == 60
+    soon = datetime.now(timezone.utc) + timedelta(seconds=2)
+    reaper.note(
+        {"kind": events.LOCK_HEARTBEAT, "data": {"expires_at": soon.isoformat()}}
+    )
+    assert 1 < reaper.next_wake() <= 2.1
+    reaper.note({"kind": events.TASK_CREATED, "data": None})
+    assert len(reaper.heap) == 2
+
+
+@pytest.mark.asyncio
+async def test_reaper_refresh_skips_expired_locks(client, project, session):
+    task = await make_task(client, session, project["id"])
+    await client.post(
+        f"/tasks/{task['id']}/lock",
+        json={"caller_label": "agent-1", "lock_purpose": "sizing"},
+    )
+    await expire_locks(session, task["id"])
+
+    # As if the delete had skipped a row another transaction still holds
+    reaper = LockReaper(lambda: contextlib.nullcontext(session))
+    await reaper.refresh()
+    assert reaper.heap == []
+    assert reaper.next_wake() == 60
+
+
+# --- Storage ---
+
+
+@pytest.mark.asyncio
+async def test_configure_lock_storage(client, project, session):
+    persistence = text("SELECT relpersistence::text FROM pg_class WHERE oid = 'task_locks'::regclass")
+    task = await make_task(client, session, project["id"])
+    await client.post(
+        f"/tasks/{task['id']}/lock",
+        json={"caller_label": "agent-1", "lock_purpose": "sizing"},
+    )
+
+    assert await configure_lock_storage(session, "unlogged") is True
+    assert (await session.execute(persistence)).scalar_one() == "u"
+    assert await configure_lock_storage(session, "unlogged") is False
+
+    resp = await client.patch(f"/tasks/{task['id']}/lock/heartbeat?caller_label=agent-1")
+    assert resp.status_code == 200
+
+    assert await configure_lock_storage(session, "logged") is True
+    assert (await session.execute(persistence)).scalar_one() == "p"
+
+    with pytest.raises(ValueError):
+        await configure_lock_storage(session, "memory")
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app.services import maintenance
+from app.services.maintenance import LeaderElection
+from conftest import DATABASE_URL
+
+DSN = DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+
+# Distinct from MAINTENANCE_LOCK_KEY so a running app can't interfere
+TEST_LOCK_KEY = 0x63686F7275730099
+
+
+async def wait_until(predicate, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def fast_election(monkeypatch):
+    monkeypatch.setattr(maintenance, "LEADER_RETRY_SECONDS", 0.05)
+    monkeypatch.setattr(maintenance, "LEADER_CHECK_SECONDS", 0.05)
+
+
+@pytest.mark.asyncio
+async def test_single_leader_with_failover(fast_election):
+    running: list[str] = []
+
+    def job(name):
+        async def run(session_factory):
+            running.append(name)
+            try:
+                await asyncio.Event().wait()
+            finally:
+                running.remove(name)
+
+        return run
+
+    first = LeaderElection(DSN, None, {"job": job("first")}, key=TEST_LOCK_KEY)
+    second = LeaderElection(DSN, None, {"job": job("second")}, key=TEST_LOCK_KEY)
+    first_task = asyncio.create_task(first.run())
+    await wait_until(lambda: running == ["first"])
+    second_task = asyncio.create_task(second.run())
+    try:
+        await asyncio.sleep(0.3)
+        assert first.is_leader and not second.is_leader
+        assert running == ["first"]
+
+        first_task.cancel()
+        await wait_until(lambda: running == ["second"])
+        assert second.is_leader
+    finally:
+        for task in (first_task, second_task):
+            task.cancel()
+        await asyncio.gather(first_task, second_task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_periodic_job_survives_errors(fast_election, monkeypatch):
+    jobs: dict = {}
+    monkeypatch.setattr(maintenance, "_jobs", jobs)
+    calls = []
+
+    async def flaky(session_factory):
+        calls.append(session_factory)
+        raise RuntimeError("boom")
+
+    maintenance.register_periodic_job("flaky", 0.01, flaky)
+    election = LeaderElection(DSN, "factory", key=TEST_LOCK_KEY)
+    assert election.jobs is jobs
+    task = asyncio.create_task(election.run())
+    try:
+        await wait_until(lambda: len(calls) >= 3)
+        assert set(calls) == {"factory"}
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_startup_job_runs_once_per_term(fast_election, monkeypatch):
+    jobs: dict = {}
+    monkeypatch.setattr(maintenance, "_jobs", jobs)
+    calls = []
+
+    async def setup(session_factory):
+        calls.append(session_factory)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+
+    maintenance.register_startup_job("setup", setup)
+    election = LeaderElection(DSN, "factory", key=TEST_LOCK_KEY)
+    task = asyncio.create_task(election.run())
+    try:
+        await wait_until(lambda: len(calls) >= 2)
+        await asyncio.sleep(0.2)
+        assert calls == ["factory", "factory"]
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_periodic_job_can_run_at_start(fast_election, monkeypatch):
+    jobs: dict = {}
+    monkeypatch.setattr(maintenance, "_jobs", jobs)
+    calls = []
+
+    async def job(session_factory):
+        calls.append(session_factory)
+
+    maintenance.register_periodic_job("eager", 3600, job, run_at_start=True)
+    election = LeaderElection(DSN, "factory", key=TEST_LOCK_KEY)
+    task = asyncio.create_task(election.run())
+    try:
+        await wait_until(lambda: calls)
+        assert calls == ["factory"]
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
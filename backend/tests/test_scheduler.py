@@ -0,0 +1,142 @@
+import uuid
+
+import pytest
+
+from app.services import scheduler_service
+from app.services.scheduler_service import DeficitRoundRobin, ProjectQueue
+
+A = uuid.UUID(int=1)
+B = uuid.UUID(int=2)
+
+
+def _queue(costs, weight=1):
+    return ProjectQueue(
+        weight=weight, cap=None, task_ids=[uuid.uuid4() for _ in costs], costs=costs
+    )
+
+
+def _projects(picks):
+    return [pid for pid, _ in picks]
+
+
+@pytest.fixture
+async def project(client):
+    resp = await client.post("/projects", json={"name": "Scheduler Project"})
+    return resp.json()
+
+
+async def _create_tasks(client, project_id, count):
+    ids = []
+    for i in range(count):
+        resp = await client.post(
+            f"/projects/{project_id}/tasks",
+            json={"name": f"Task {i}", "task_type": "feature"},
+        )
+        ids.append(resp.json()["id"])
+    return ids
+
+
+def test_drr_shares_points_not_task_counts():
+    drr = DeficitRoundRobin()
+    queues = {A: _queue([1] * 6), B: _queue([3, 3])}
+    picks, _ = drr.plan(queues, 8)
+    assert _projects(picks) == [A, A, A, B, A, A, A, B]
+
+
+def test_drr_weights():
+    drr = DeficitRoundRobin()
+    queues = {A: _queue([1] * 6, weight=3), B: _queue([1] * 6)}
+    picks, _ = drr.plan(queues, 8)
+    assert _projects(picks) == [A, A, A, B, A, A, A, B]
+
+
+def test_drr_plan_previews_and_apply_advances():
+    drr = DeficitRoundRobin()
+    queues = {A: _queue([1, 1]), B: _queue([1, 1])}
+    first, state = drr.plan(queues, 1)
+    assert drr.plan(queues, 1)[0] == first
+
+    drr.apply(state)
+    picks, _ = drr.plan(queues, 1)
+    assert _projects(picks) == [B]
+
+
+def test_drr_drained_queue_leaves_ring():
+    drr = DeficitRoundRobin()
+    queues = {A: _queue([1]), B: _queue([1, 1, 1])}
+    picks, state = drr.plan(queues, 4)
+    assert _projects(picks) == [A, B, B, B]
+    assert A not in state.deficits
+
+
+@pytest.mark.asyncio
+async def test_fair_available_interleaves_projects(client, project):
+    scheduler_service._schedulers.clear()
+    other = (await client.post("/projects", json={"name": "Other"})).json()
+    await _create_tasks(client, project["id"], 4)
+    await _create_tasks(client, other["id"], 2)
+
+    resp = await client.get("/tasks/available?operation=sizing&schedule=fair&limit=6")
+    assert resp.status_code == 200
+    order = [t["project_id"] for t in resp.json()]
+    assert len(order) == 6
+    assert order[0] != order[1] and order[2] != order[3]
+    assert order[4:] == [project["id"], project["id"]]
+
+
+@pytest.mark.asyncio
+async def test_fair_available_honours_weights_and_caps(client, project):
+    scheduler_service._schedulers.clear()
+    heavy = (
+        await client.post(
+            "/projects", json={"name": "Heavy", "scheduling_weight": 3}
+        )
+    ).json()
+    assert heavy["scheduling_weight"] == 3
+    await _create_tasks(client, project["id"], 4)
+    await _create_tasks(client, heavy["id"], 4)
+
+    resp = await client.get("/tasks/available?operation=sizing&schedule=fair&limit=4")
+    order = [t["project_id"] for t in resp.json()]
+    assert order.count(heavy["id"]) == 3
+
+    resp = await client.put(
+        f"/projects/{heavy['id']}", json={"concurrency_caps": {"sizing": 1}}
+    )
+    assert resp.json()["concurrency_caps"] == {"sizing": 1}
+    resp = await client.get("/tasks/available?operation=sizing&schedule=fair&limit=8")
+    order = [t["project_id"] for t in resp.json()]
+    assert order.count(heavy["id"]) == 1
+    assert order.count(project["id"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_fair_claim_respects_cap(client, project):
+    scheduler_service._schedulers.clear()
+    await client.put(
+        f"/projects/{project['id']}", json={"concurrency_caps": {"sizing": 1}}
+    )
+    await _create_tasks(client, project["id"], 2)
+    body = {
+        "caller_label": "agent-1",
+        "operation": "sizing",
+        "project_id": project["id"],
+        "schedule": "fair",
+    }
+
+    resp = await client.post("/tasks/claim", json=body)
+    assert resp.status_code == 201
+    resp = await client.post("/tasks/claim", json=body)
+    assert resp.status_code == 404
+
+    # Caps only bind the fair scheduler
+    resp = await client.post("/tasks/claim", json={**body, "schedule": "priority"})
+    assert resp.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_fair_available_rejects_cursor(client):
+    resp = await client.get(
+        "/tasks/available?operation=sizing&schedule=fair&offset=10"
+    )
+    assert resp.status_code == 400
@@ -1,4 +1,14 @@
+import asyncio
+import uuid
+
 import pytest
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.project import Project
+from app.models.task import Task
+from app.services.pagination import encode_cursor
+from app.services.task_service import refresh_rollups
 
 
 @pytest.fixture
@@ -122,6 +132,7 @@ async def test_computed_fields_needs_refinement(client, project, session):
     )
     session.add(task)
     await session.flush()
+    await refresh_rollups(session, task.id)
 
     resp = await client.get(f"/tasks/{task.id}")
     assert resp.json()["readiness"] == "needs_refinement"
@@ -141,6 +152,7 @@ async def test_computed_fields_ready(client, project, session):
     )
     session.add(task)
     await session.flush()
+    await refresh_rollups(session, task.id)
 
     resp = await client.get(f"/tasks/{task.id}")
     data = resp.json()
@@ -163,6 +175,7 @@ async def test_computed_fields_needs_breakdown(client, project, session):
     )
     session.add(task)
     await session.flush()
+    await refresh_rollups(session, task.id)
 
     resp = await client.get(f"/tasks/{task.id}")
     assert resp.json()["readiness"] == "needs_breakdown"
@@ -182,6 +195,7 @@ async def test_computed_fields_rolled_up_points(client, project, session):
     )
     session.add(parent)
     await session.flush()
+    await refresh_rollups(session, parent.id)
 
     child1 = Task(
         project_id=project["id"],
@@ -201,6 +215,8 @@ async def test_computed_fields_rolled_up_points(client, project, session):
     )
     session.add_all([child1, child2])
     await session.flush()
+    await refresh_rollups(session, child1.id)
+    await refresh_rollups(session, child2.id)
 
     resp = await client.get(f"/tasks/{parent.id}")
     data = resp.json()
@@ -224,6 +240,7 @@ async def test_computed_fields_unsized_children(client, project, session):
     )
     session.add(parent)
     await session.flush()
+    await refresh_rollups(session, parent.id)
 
     child1 = Task(
         project_id=project["id"],
@@ -242,6 +259,8 @@ async def test_computed_fields_unsized_children(client, project, session):
     )
     session.add_all([child1, child2])
     await session.flush()
+    await refresh_rollups(session, child1.id)
+    await refresh_rollups(session, child2.id)
 
     resp = await client.get(f"/tasks/{parent.id}")
     data = resp.json()
@@ -263,6 +282,7 @@ async def test_blocked_by_children(client, project, session):
     )
     session.add(parent)
     await session.flush()
+    await refresh_rollups(session, parent.id)
 
     child = Task(
         project_id=project["id"],
@@ -274,6 +294,7 @@ async def test_blocked_by_children(client, project, session):
     )
     session.add(child)
     await session.flush()
+    await refresh_rollups(session, child.id)
 
     resp = await client.get(f"/tasks/{parent.id}")
     assert resp.json()["readiness"] == "blocked_by_children"
@@ -341,6 +362,115 @@ async def test_tree(client, project):
     assert mid_node["children"][0]["id"] == leaf_id
 
 
+@pytest.mark.asyncio
+async def test_tree_children_ordered_by_position(client, project):
+    root_id, mid_id, leaf_id = await _create_hierarchy(client, project)
+    second = await client.post(
+        f"/tasks/{root_id}/subtasks",
+        json={"name": "Second", "task_type": "feature"},
+    )
+    second_id = second.json()["id"]
+    await client.patch(f"/tasks/{second_id}/reorder", json={"position": 0})
+
+    resp = await client.get(f"/tasks/{root_id}/tree")
+    data = resp.json()
+    assert [c["id"] for c in data["children"]] == [second_id, mid_id]
+    assert data["children"][0]["children"] == []
+    assert data["children"][1]["children"][0]["id"] == leaf_id
+    assert data["children_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_tree_max_depth_and_expand(client, project):
+    root_id, mid_id, leaf_id = await _create_hierarchy(client, project)
+
+    resp = await client.get(f"/tasks/{root_id}/tree?max_depth=1")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["expand_cursor"] is None
+    mid_node = data["children"][0]
+    assert mid_node["children"] == []
+    assert mid_node["expand_cursor"] is not None
+
+    resp = await client.get(
+        f"/tasks/{mid_id}/children", params={"cursor": mid_node["expand_cursor"]}
+    )
+    assert resp.status_code == 200
+    page = resp.json()
+    assert [c["id"] for c in page["children"]] == [leaf_id]
+    assert page["children"][0]["expand_cursor"] is None
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_tree_max_nodes_and_expand(client, project):
+    root_id, mid_id, _ = await _create_hierarchy(client, project)
+    second = await client.post(
+        f"/tasks/{root_id}/subtasks",
+        json={"name": "Second", "task_type": "feature"},
+    )
+
+    resp = await client.get(f"/tasks/{root_id}/tree?max_nodes=2")
+    data = resp.json()
+    assert [c["id"] for c in data["children"]] == [mid_id]
+    assert data["expand_cursor"] is not None
+
+    resp = await client.get(
+        f"/tasks/{root_id}/children", params={"cursor": data["expand_cursor"]}
+    )
+    assert [c["id"] for c in resp.json()["children"]] == [second.json()["id"]]
+
+    resp = await client.get(f"/tasks/{root_id}/children?limit=1")
+    page = resp.json()
+    assert [c["id"] for c in page["children"]] == [mid_id]
+    assert page["children"][0]["expand_cursor"] is not None
+    assert page["next_cursor"] is not None
+
+
+@pytest.mark.asyncio
+async def test_children_invalid_cursor(client, project):
+    root_id, _, _ = await _create_hierarchy(client, project)
+    resp = await client.get(f"/tasks/{root_id}/children?cursor=not-a-cursor")
+    assert resp.status_code == 400
+
+    # Well-formed JSON with the wrong types
+    resp = await client.get(
+        f"/tasks/{root_id}/children", params={"cursor": encode_cursor([1, 5])}
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_hierarchy_index_maintained(client, project, session):
+    from sqlalchemy import select
+
+    from app.models.closure import TaskClosure
+
+    root_id, mid_id, leaf_id = await _create_hierarchy(client, project)
+
+    result = await session.execute(
+        select(TaskClosure.ancestor_id, TaskClosure.depth)
+        .where(TaskClosure.descendant_id == uuid.UUID(leaf_id))
+        .order_by(TaskClosure.depth)
+    )
+    assert [(str(a), d) for a, d in result.all()] == [
+        (leaf_id, 0),
+        (mid_id, 1),
+        (root_id, 2),
+    ]
+
+    await client.delete(f"/tasks/{mid_id}")
+
+    result = await session.execute(
+        select(TaskClosure.descendant_id).where(
+            TaskClosure.ancestor_id == uuid.UUID(root_id)
+        )
+    )
+    assert [str(d) for d in result.scalars().all()] == [root_id]
+    resp = await client.get(f"/tasks/{root_id}")
+    assert resp.json()["children_count"] == 0
+
+
 @pytest.mark.asyncio
 async def test_tree_not_found(client):
     resp = await client.get("/tasks/00000000-0000-0000-0000-000000000000/tree")
@@ -525,3 +655,94 @@ async def test_reorder(client, project):
     # T1 should have shifted to position 1
     resp = await client.get(f"/tasks/{t1_id}")
     assert resp.json()["position"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sibling_sizing_keeps_rollups(engine):
+    # Needs committed rows seen by two connections, so it bypasses the
+    # rolled-back test session and cleans up after itself.
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as s:
+        project = Project(name="Rollup race")
+        s.add(project)
+        await s.flush()
+        parent = Task(project_id=project.id, name="Parent", task_type="feature")
+        s.add(parent)
+        await s.flush()
+        children = [
+            Task(project_id=project.id, parent_task_id=parent.id, name=n, task_type="feature")
+            for n in ("A", "B")
+        ]
+        s.add_all(children)
+        await s.flush()
+        for c in children:
+            await refresh_rollups(s, c.id)
+        await s.commit()
+
+    async def size(session, task_id, points):
+        await session.execute(update(Task).where(Task.id == task_id).values(points=points))
+        await refresh_rollups(session, task_id)
+
+    try:
+        async with factory() as first, factory() as second:
+            await size(first, children[0].id, 3)
+            # Blocks on the parent's row lock until the first commits
+            racing = asyncio.create_task(size(second, children[1].id, 4))
+            await asyncio.sleep(0.2)
+            assert not racing.done()
+            await first.commit()
+            await racing
+            await second.commit()
+
+        async with factory() as s:
+            row = (
+                await s.execute(
+                    select(Task.rolled_up_points, Task.unsized_children).where(
+                        Task.id == parent.id
+                    )
+                )
+            ).one()
+            assert tuple(row) == (7, 0)
+    finally:
+        async with factory() as s:
+            await s.execute(delete(Project).where(Project.id == project.id))
+            await s.commit()
+
+
+@pytest.mark.asyncio
+async def test_delete_task_beyond_bind_limit(client, project, session):
+    # More descendants than asyncpg can bind as parameters (32767)
+    parent = (
+        await client.post(
+            f"/projects/{project['id']}/tasks",
+            json={"name": "Parent", "task_type": "feature"},
+        )
+    ).json()
+    params = {"project_id": project["id"], "parent_id": parent["id"]}
+    await session.execute(
+        text(
+            "INSERT INTO tasks (project_id, parent_task_id, name, task_type) "
+            "SELECT CAST(:project_id AS uuid), CAST(:parent_id AS uuid), 'Child ' || n, 'feature' "
+            "FROM generate_series(1, 33000) AS n"
+        ),
+        params,
+    )
+    await session.execute(
+        text(
+            "INSERT INTO task_closure (ancestor_id, descendant_id, depth) "
+            "SELECT id, id, 0 FROM tasks WHERE parent_task_id = CAST(:parent_id AS uuid) "
+            "UNION ALL "
+            "SELECT CAST(:parent_id AS uuid), id, 1 FROM tasks "
+            "WHERE parent_task_id = CAST(:parent_id AS uuid)"
+        ),
+        params,
+    )
+    # Without fresh statistics the planner expects one row and nests loops
+    await session.execute(text("ANALYZE tasks, task_closure"))
+
+    resp = await client.delete(f"/tasks/{parent['id']}")
+    assert resp.status_code == 204
+    remaining = await session.execute(
+        select(func.count()).select_from(Task).where(Task.project_id == uuid.UUID(project["id"]))
+    )
+    assert remaining.scalar() == 0
@@ -1,6 +1,6 @@
 import type { ApiError } from "./types";
 
-const BASE_URL = "/api";
+export const BASE_URL = "/api";
 
 export class ApiRequestError extends Error {
   constructor(
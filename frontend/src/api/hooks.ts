@@ -1,5 +1,6 @@
+import { useEffect } from "react";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
-import { get, post, put, patch, del } from "./client";
+import { BASE_URL, get, post, put, patch, del } from "./client";
 import type {
   ProjectDetail,
   ProjectCreate,
@@ -209,7 +210,6 @@ export function useInProgress(projectId: string) {
     queryKey: keys.inProgress(projectId),
     queryFn: () =>
       get<TaskWithLockInfo[]>(`/projects/${projectId}/in-progress`),
-    refetchInterval: 10_000,
   });
 }
 
@@ -220,6 +220,131 @@ export function useNeedsRefinement(projectId: string) {
   });
 }
 
+// --- Events ---
+
+// Events that change what the project's lists and trees show. Heartbeats
+// only move lock_expires_at, which is patched into the cache instead.
+const projectEventKinds = [
+  "task.created",
+  "task.updated",
+  "task.deleted",
+  "task.status_changed",
+  "lock.acquired",
+  "lock.released",
+  "lock.expired",
+] as const;
+
+// Events arriving within this window are applied as one invalidation.
+const EVENT_FLUSH_MS = 500;
+
+// Event ids remembered to drop the server's look-back replay on reconnect.
+const SEEN_EVENT_IDS = 1000;
+
+function eventTaskId(event: Event): string | undefined {
+  try {
+    return JSON.parse((event as MessageEvent<string>).data).task_id;
+  } catch {
+    return undefined;
+  }
+}
+
+/** Keep a project's cached queries fresh from its server-sent event stream. */
+export function useProjectEvents(projectId: string) {
+  const qc = useQueryClient();
+  useEffect(() => {
+    // EventSource reconnects on its own and resumes with Last-Event-ID.
+    const source = new EventSource(`${BASE_URL}/projects/${projectId}/events`);
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    let resetAll = false;
+    const changedTasks = new Set<string>();
+    const loggedTasks = new Set<string>();
+    const seen = new Set<string>();
+
+    // A resume replays a few ids before Last-Event-ID; skip those we've had.
+    const isNew = (event: Event) => {
+      const id = (event as MessageEvent).lastEventId;
+      if (seen.has(id)) return false;
+      seen.add(id);
+      if (seen.size > SEEN_EVENT_IDS) {
+        seen.delete(seen.values().next().value!);
+      }
+      return true;
+    };
+
+    const flush = () => {
+      timer = undefined;
+      if (resetAll) {
+        qc.invalidateQueries({ queryKey: keys.project(projectId) });
+        qc.invalidateQueries({ queryKey: ["tasks"] });
+      } else {
+        if (changedTasks.size > 0) {
+          qc.invalidateQueries({ queryKey: keys.project(projectId) });
+          // A change can surface in any ancestor's tree
+          qc.invalidateQueries({
+            predicate: (q) => q.queryKey[0] === "tasks" && q.queryKey[2] === "tree",
+          });
+        }
+        for (const id of changedTasks) {
+          qc.invalidateQueries({ queryKey: keys.task(id) });
+        }
+        for (const id of loggedTasks) {
+          if (!changedTasks.has(id)) {
+            qc.invalidateQueries({ queryKey: keys.workLog(id) });
+          }
+        }
+      }
+      resetAll = false;
+      changedTasks.clear();
+      loggedTasks.clear();
+    };
+    const schedule = () => {
+      timer ??= setTimeout(flush, EVENT_FLUSH_MS);
+    };
+
+    const onChange = (event: Event) => {
+      if (!isNew(event)) return;
+      const id = eventTaskId(event);
+      if (id) changedTasks.add(id);
+      else resetAll = true;
+      schedule();
+    };
+    const onWorkLog = (event: Event) => {
+      if (!isNew(event)) return;
+      const id = eventTaskId(event);
+      if (id) loggedTasks.add(id);
+      schedule();
+    };
+    const onReset = () => {
+      resetAll = true;
+      schedule();
+    };
+    const onHeartbeat = (event: Event) => {
+      let body: { task_id?: string; expires_at?: string };
+      try {
+        body = JSON.parse((event as MessageEvent<string>).data);
+      } catch {
+        return;
+      }
+      const { task_id: id, expires_at: expiresAt } = body;
+      if (!id || !expiresAt) return;
+      qc.setQueryData<TaskWithLockInfo[]>(keys.inProgress(projectId), (tasks) =>
+        tasks?.map((t) =>
+          t.id === id ? { ...t, lock_expires_at: expiresAt } : t,
+        ),
+      );
+    };
+
+    for (const kind of projectEventKinds) source.addEventListener(kind, onChange);
+    source.addEventListener("work_log.appended", onWorkLog);
+    source.addEventListener("lock.heartbeat", onHeartbeat);
+    source.addEventListener("reset", onReset);
+    return () => {
+      clearTimeout(timer);
+      source.close();
+    };
+  }, [projectId, qc]);
+}
+
 // --- Locks ---
 
 export function useForceReleaseLock(projectId: string) {
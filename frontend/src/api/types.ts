@@ -22,10 +22,16 @@ export type LockPurpose =
 
 // Projects
 
+export type OperationCaps = Partial<
+  Record<"sizing" | "breakdown" | "implementation", number>
+>;
+
 export interface Project {
   id: string;
   name: string;
   description: string | null;
+  scheduling_weight: number;
+  concurrency_caps: OperationCaps | null;
   created_at: string;
   updated_at: string;
 }
@@ -39,11 +45,15 @@ export interface ProjectDetail extends Project {
 export interface ProjectCreate {
   name: string;
   description?: string | null;
+  scheduling_weight?: number;
+  concurrency_caps?: OperationCaps | null;
 }
 
 export interface ProjectUpdate {
   name?: string;
   description?: string | null;
+  scheduling_weight?: number;
+  concurrency_caps?: OperationCaps | null;
 }
 
 // Tasks
@@ -71,6 +81,12 @@ export interface TaskRead {
 
 export interface TaskTreeNode extends TaskRead {
   children: TaskTreeNode[];
+  expand_cursor: string | null;
+}
+
+export interface TaskChildrenPage {
+  children: TaskTreeNode[];
+  next_cursor: string | null;
 }
 
 export interface TaskWithLockInfo extends TaskRead {
@@ -1,10 +1,11 @@
+import { useEffect, useState } from "react";
 import { useParams } from "react-router-dom";
 import { useInProgress, useForceReleaseLock } from "../api/hooks";
 import Spinner from "../components/Spinner";
 import ErrorMessage from "../components/ErrorMessage";
 
-function timeRemaining(expiresAt: string): string {
-  const diff = new Date(expiresAt).getTime() - Date.now();
+function timeRemaining(expiresAt: string, now: number): string {
+  const diff = new Date(expiresAt).getTime() - now;
   if (diff <= 0) return "Expired";
   const mins = Math.floor(diff / 60000);
   const secs = Math.floor((diff % 60000) / 1000);
@@ -15,6 +16,12 @@ export default function LockMonitor() {
   const { projectId } = useParams<{ projectId: string }>();
   const { data: tasks, isLoading, error, refetch } = useInProgress(projectId!);
   const forceRelease = useForceReleaseLock(projectId!);
+  // Ticks the countdown; the expiries themselves arrive as live events
+  const [now, setNow] = useState(Date.now());
+  useEffect(() => {
+    const timer = setInterval(() => setNow(Date.now()), 1000);
+    return () => clearInterval(timer);
+  }, []);
 
   if (isLoading) return <Spinner />;
   if (error)
@@ -26,7 +33,7 @@ export default function LockMonitor() {
     return (
       <div className="p-8 text-center text-gray-500">
         <p>No active locks.</p>
-        <p className="mt-1 text-xs">Auto-refreshes every 10 seconds.</p>
+        <p className="mt-1 text-xs">Updates live.</p>
       </div>
     );
   }
@@ -54,7 +61,7 @@ export default function LockMonitor() {
                 {t.lock_purpose}
               </td>
               <td className="px-3 py-2 font-mono text-xs text-gray-400">
-                {t.lock_expires_at ? timeRemaining(t.lock_expires_at) : "—"}
+                {t.lock_expires_at ? timeRemaining(t.lock_expires_at, now) : "—"}
               </td>
               <td className="px-3 py-2">
                 <button
@@ -72,9 +79,7 @@ export default function LockMonitor() {
           ))}
         </tbody>
       </table>
-      <p className="mt-3 text-xs text-gray-600">
-        Auto-refreshes every 10 seconds.
-      </p>
+      <p className="mt-3 text-xs text-gray-600">Updates live.</p>
     </div>
   );
 }
@@ -5,7 +5,7 @@ import {
   useParams,
   useOutletContext,
 } from "react-router-dom";
-import { useProject } from "../api/hooks";
+import { useProject, useProjectEvents } from "../api/hooks";
 import Spinner from "../components/Spinner";
 import ErrorMessage from "../components/ErrorMessage";
 import TaskDetailPanel from "../components/TaskDetailPanel";
@@ -29,6 +29,7 @@ export default function ProjectLayout() {
   const { projectId } = useParams<{ projectId: string }>();
   const { data: project, isLoading, error, refetch } = useProject(projectId!);
   const [selectedTaskId, setSelectedTaskId] = useState<string | null>(null);
+  useProjectEvents(projectId!);
 
   const selectTask = useCallback((id: string) => setSelectedTaskId(id), []);
 